@@ -0,0 +1,204 @@
+"""Compiled fire spread, explosion and shockwave propagation for GameMechanics, used by bombers.py"""
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional: without it the kernels run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+from _fastmove import DX, DY
+
+# Event kinds written by explosion_ray() and shockwave_ray(), as rows of (kind, y, x, direction, value)
+EVENT_DOOR_BLAST = 0    # door on the exploding cell destroyed
+EVENT_DOOR = 1          # door in the explosion path destroyed
+EVENT_WALL = 2          # wall side damaged, value holds its new damage
+EVENT_VICTIM = 3        # victim reached by the blast
+EVENT_FIRE = 4          # cell set on fire
+
+# Enough rows for one explosion ray plus its shockwave on any board this game uses
+MAX_EVENTS = 256
+
+# Same values as DoorState.ABSENT and GridState.POI_VICTIM / POI_NONE
+_DOOR_ABSENT = 0
+_POI_NONE = 0
+_POI_VICTIM = 1
+
+@njit(cache=True)
+def _emit(events, n, kind, y, x, direction, value):
+    events[n, 0] = kind
+    events[n, 1] = y
+    events[n, 2] = x
+    events[n, 3] = direction
+    events[n, 4] = value
+    return n + 1
+
+@njit(cache=True)
+def hit_wall(cell_bits, open_sides, wall_damage, y, x, direction):
+    """Adds a damage point to a wall side, opening both sides at 2 points, and returns the new damage"""
+    rows, columns = cell_bits.shape
+    wall_damage[y, x, direction] += 1
+    damage = wall_damage[y, x, direction]
+
+    if damage >= 2:
+        cell_bits[y, x] &= 0xFF ^ (1 << direction)
+        open_sides[y, x, direction] = True
+
+        opposite = (direction + 2) % 4
+        nx = x + DX[direction]
+        ny = y + DY[direction]
+        if 0 <= ny < rows and 0 <= nx < columns:
+            cell_bits[ny, nx] &= 0xFF ^ (1 << opposite)
+            open_sides[ny, nx, opposite] = True
+            wall_damage[ny, nx, opposite] = damage
+
+    return damage
+
+@njit(cache=True)
+def _destroy_door(door_state, y, x, direction):
+    """Clears a door on both of its sides"""
+    rows, columns = door_state.shape[:2]
+    door_state[y, x, direction] = _DOOR_ABSENT
+    nx = x + DX[direction]
+    ny = y + DY[direction]
+    if 0 <= ny < rows and 0 <= nx < columns:
+        door_state[ny, nx, (direction + 2) % 4] = _DOOR_ABSENT
+
+@njit(cache=True)
+def _hit_cell(poi, y, x, events, n):
+    """Kills a victim at (y, x) and emits it; returns the event count"""
+    if poi[y, x] == _POI_VICTIM:
+        poi[y, x] = _POI_NONE
+        n = _emit(events, n, EVENT_VICTIM, y, x, 0, 0)
+    return n
+
+@njit(cache=True)
+def shockwave_ray(row, col, direction, fire, smoke, poi, cell_bits, open_sides, wall_damage,
+                  perimeter, door_mask, events, n):
+    """Runs a shockwave from the burning cell (row, col), appending to events from n; returns the event count"""
+    rows, columns = fire.shape
+    dx = DX[direction]
+    dy = DY[direction]
+    x = col
+    y = row
+
+    while True:
+        px = x
+        py = y
+        x += dx
+        y += dy
+
+        if y < 0 or y >= rows or x < 0 or x >= columns:
+            break
+
+        # Door sides let the shockwave through and the door is left as it is
+        if not door_mask[py, px, direction]:
+            if cell_bits[py, px] & (1 << direction) and wall_damage[py, px, direction] < 2:
+                damage = hit_wall(cell_bits, open_sides, wall_damage, py, px, direction)
+                n = _emit(events, n, EVENT_WALL, py, px, direction, damage)
+                if damage < 2:
+                    break
+
+        if perimeter[y, x]:
+            break
+
+        n = _hit_cell(poi, y, x, events, n)
+
+        if fire[y, x]:
+            # Continue through cells with fire
+            continue
+
+        # Smoke or an empty cell catches fire and stops the wave
+        smoke[y, x] = False
+        fire[y, x] = True
+        n = _emit(events, n, EVENT_FIRE, y, x, direction, 0)
+        break
+
+    return n
+
+@njit(cache=True)
+def explosion_ray(row, col, direction, fire, smoke, poi, cell_bits, open_sides, wall_damage,
+                  perimeter, door_mask, door_state, events):
+    """Runs one explosion ray from (row, col), mutating the arrays, and returns how many events it wrote"""
+    rows, columns = fire.shape
+    dx = DX[direction]
+    dy = DY[direction]
+    n = 0
+
+    # The northern ray also blows away every door of the exploding cell
+    if direction == 0:
+        for d in range(4):
+            if door_mask[row, col, d] and door_state[row, col, d] != _DOOR_ABSENT:
+                _destroy_door(door_state, row, col, d)
+                n = _emit(events, n, EVENT_DOOR_BLAST, row, col, d, 0)
+
+    x = col
+    y = row
+    while True:
+        nx = x + dx
+        ny = y + dy
+
+        if ny < 0 or ny >= rows or nx < 0 or nx >= columns:
+            break
+        if perimeter[ny, nx]:
+            break
+
+        if door_mask[y, x, direction] and door_state[y, x, direction] != _DOOR_ABSENT:
+            _destroy_door(door_state, y, x, direction)
+            n = _emit(events, n, EVENT_DOOR, y, x, direction, 0)
+
+        if cell_bits[y, x] & (1 << direction) and wall_damage[y, x, direction] < 2:
+            damage = hit_wall(cell_bits, open_sides, wall_damage, y, x, direction)
+            n = _emit(events, n, EVENT_WALL, y, x, direction, damage)
+            if damage < 2:
+                break
+
+        x = nx
+        y = ny
+        n = _hit_cell(poi, y, x, events, n)
+
+        if fire[y, x]:
+            # Explosion reached a burning cell: it carries on as a shockwave
+            n = shockwave_ray(y, x, direction, fire, smoke, poi, cell_bits, open_sides, wall_damage,
+                              perimeter, door_mask, events, n)
+            break
+
+        smoke[y, x] = False
+        fire[y, x] = True
+        n = _emit(events, n, EVENT_FIRE, y, x, direction, 0)
+
+    return n
+
+@njit(cache=True)
+def spread_fire(fire, smoke, open_sides, interior, flashover, new_smoke):
+    """Marks the interior cells fire reaches through an open side this turn and returns whether there are any.
+
+    Reached cells holding smoke are set in flashover, the rest in new_smoke; fire and smoke are not changed.
+    """
+    rows, columns = fire.shape
+    reached = False
+
+    for y in range(rows):
+        for x in range(columns):
+            flashover[y, x] = False
+            new_smoke[y, x] = False
+            if fire[y, x] or not interior[y, x]:
+                continue
+
+            for d in range(4):
+                # A burning neighbour whose side facing this cell is open
+                ny = y + DY[d]
+                nx = x + DX[d]
+                if 0 <= ny < rows and 0 <= nx < columns and fire[ny, nx] and open_sides[ny, nx, (d + 2) % 4]:
+                    if smoke[y, x]:
+                        flashover[y, x] = True
+                    else:
+                        new_smoke[y, x] = True
+                    reached = True
+                    break
+
+    return reached
@@ -0,0 +1,126 @@
+"""Compiled move and action candidate search for FirefighterAgent, used by bombers.py"""
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernel runs as plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# Same order as DirectionHelper.DIRECTIONS (north, east, south, west)
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
+
+# Action codes written by candidate_actions(); door and cut actions add the direction to their base
+ACTION_MOVE = 0
+ACTION_EXTINGUISH = 1
+ACTION_CONVERT = 2
+ACTION_REMOVE_SMOKE = 3
+ACTION_EXTINGUISH_ADJACENT = 4
+ACTION_CONVERT_ADJACENT = 5
+ACTION_REMOVE_ADJACENT_SMOKE = 6
+ACTION_PASS = 7
+ACTION_DOOR = 8     # 8-11
+ACTION_CUT = 12     # 12-15
+
+# Upper bound on the candidates of one cell: move, 3 on the cell, 3 per side, 4 doors, 4 cuts and pass
+MAX_ACTIONS = 25
+
+# Bit layout of cell_bits, same as DirectionHelper.DOOR_SHIFT
+_DOOR_SHIFT = 4
+
+@njit(cache=True)
+def valid_moves(x, y, carrying, ap, pass_mask, fire, perimeter, entry, out):
+    """Writes (x, y, ap_cost) of every legal move from (x, y) into out and returns how many there are"""
+    rows, columns = fire.shape
+    n = 0
+
+    for d in range(4):
+        if not pass_mask[y, x, d]:
+            continue
+
+        nx = x + DX[d]
+        ny = y + DY[d]
+        if ny < 0 or ny >= rows or nx < 0 or nx >= columns:
+            continue
+
+        # Perimeter cells can only be entered through an entry
+        if perimeter[ny, nx] and not entry[ny, nx]:
+            continue
+
+        dest_fire = fire[ny, nx]
+        ap_cost = 2 if (dest_fire or carrying) else 1
+        if ap < ap_cost:
+            continue
+
+        # Cannot carry victim into fire
+        if carrying and dest_fire:
+            continue
+
+        out[n, 0] = nx
+        out[n, 1] = ny
+        out[n, 2] = ap_cost
+        n += 1
+
+    return n
+
+@njit(cache=True)
+def candidate_actions(x, y, ap, at_ambulance, fire, smoke, cell_bits, nbr_y, nbr_x,
+                      perimeter_walls, actions, adjacent):
+    """Writes the action codes available from (x, y) into actions and the open neighbours into adjacent.
+
+    Returns (action count, adjacent count). Candidates come in the order the agent draws them from.
+    """
+    bits = cell_bits[y, x]
+    n = 0
+    actions[n] = ACTION_MOVE
+    n += 1
+
+    # Neighbours on sides without a wall (destroyed walls are cleared from the bits)
+    m = 0
+    for d in range(4):
+        ny = nbr_y[y, x, d]
+        if ny >= 0 and not bits & (1 << d):
+            adjacent[m, 0] = ny
+            adjacent[m, 1] = nbr_x[y, x, d]
+            m += 1
+
+    if fire[y, x] and ap >= 2:
+        actions[n] = ACTION_EXTINGUISH
+        actions[n + 1] = ACTION_CONVERT
+        n += 2
+
+    if smoke[y, x] and ap >= 1:
+        actions[n] = ACTION_REMOVE_SMOKE
+        n += 1
+
+    for i in range(m):
+        cell_y = adjacent[i, 0]
+        cell_x = adjacent[i, 1]
+        if fire[cell_y, cell_x] and ap >= 2:
+            actions[n] = ACTION_EXTINGUISH_ADJACENT
+            actions[n + 1] = ACTION_CONVERT_ADJACENT
+            n += 2
+        if smoke[cell_y, cell_x] and ap >= 1:
+            actions[n] = ACTION_REMOVE_ADJACENT_SMOKE
+            n += 1
+
+    if ap >= 1:
+        doors = bits >> _DOOR_SHIFT
+        for d in range(4):
+            if doors & (1 << d):
+                actions[n] = ACTION_DOOR + d
+                n += 1
+
+    if ap >= 2:
+        for d in range(4):
+            if bits & (1 << d) and not perimeter_walls[y, x, d]:
+                actions[n] = ACTION_CUT + d
+                n += 1
+
+    if ap <= 4 or at_ambulance:
+        actions[n] = ACTION_PASS
+        n += 1
+
+    return n, m
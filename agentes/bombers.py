@@ -1,9 +1,31 @@
+import argparse
+import copy
+import os
+import sys
+import logging
+import multiprocessing
+from collections import deque
+from functools import lru_cache
 from mesa import Agent, Model
 from mesa.time import RandomActivation
 from mesa.space import MultiGrid  
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
+from _fastmove import (
+    ACTION_CONVERT, ACTION_CONVERT_ADJACENT, ACTION_CUT, ACTION_DOOR, ACTION_EXTINGUISH,
+    ACTION_EXTINGUISH_ADJACENT, ACTION_MOVE, ACTION_REMOVE_ADJACENT_SMOKE, ACTION_REMOVE_SMOKE,
+    DX, DY, MAX_ACTIONS, candidate_actions, valid_moves,
+)
+from _fastfire import (
+    EVENT_DOOR_BLAST, EVENT_FIRE, EVENT_VICTIM, EVENT_WALL, HAVE_NUMBA, MAX_EVENTS,
+    explosion_ray, hit_wall, shockwave_ray, spread_fire,
+)
+
+# The per-turn action list from FireRescueModel.step is logged at DEBUG level (enabled with --debug)
+logger = logging.getLogger(__name__)
 
 
 
@@ -33,28 +55,29 @@ class JSONExporter:
             })
         
         cells = []
+        grid = model.grid_state
         for y in range(model.grid.height):
             for x in range(model.grid.width):
-                if x < model.grid_state.shape[1] and y < model.grid_state.shape[0]:
-                    cell = model.grid_state[y, x]
+                if x < grid.shape[1] and y < grid.shape[0]:
+                    bits = int(grid.bits[y, x])
                     cell_json = {
                         "x": x,
                         "y": y,
-                        "walls": [bool(wall) for wall in cell["walls"]],
-                        "door": cell["door"],
-                        "fire": cell["fire"],
-                        "smoke": cell["smoke"],
-                        "poi": cell["poi"]
+                        "walls": [bool(bits >> d & 1) for d in range(4)],
+                        "door": bool(bits >> DirectionHelper.DOOR_SHIFT),
+                        "fire": bool(grid.fire[y, x]),
+                        "smoke": bool(grid.smoke[y, x]),
+                        "poi": GridState.POI_TYPES[grid.poi[y, x]]
                     }
                     cells.append(cell_json)
         
         doors = []
-        door_positions = ScenarioParser.compute_door_positions(model.scenario["doors"])
+        door_positions = model.door_positions
         for (r1, c1), (r2, c2) in model.scenario["doors"]:
             door_state = "closed"
             for pos in door_positions:
-                if pos in model.door_states:
-                    door_state = model.door_states[pos]
+                if model.door_state[pos] != DoorState.ABSENT:
+                    door_state = DoorState.NAMES[model.door_state[pos]]
             
             doors.append({
                 "from": [c1, r1],
@@ -63,7 +86,7 @@ class JSONExporter:
             })
         
         pois = []
-        for y, x, poi_type in model.scenario["pois"]:
+        for (y, x), poi_type in model.scenario["pois"].items():
             pois.append({
                 "x": x,
                 "y": y,
@@ -93,7 +116,7 @@ class JSONExporter:
                 "lost": 0,
                 "damage": 0,
                 "pois_active": len(model.scenario["pois"]),
-                "pois_in_deck": len(model.mazo_pois) if hasattr(model, "mazo_pois") else 15
+                "pois_in_deck": len(model.mazo_pois)
             }
         }
         
@@ -201,7 +224,7 @@ class JSONExporter:
                 "lost": model.victims_lost,
                 "damage": model.damage_counters,
                 "pois_active": len(model.scenario["pois"]),
-                "pois_in_deck": len(model.mazo_pois) if hasattr(model, "mazo_pois") else 0
+                "pois_in_deck": len(model.mazo_pois)
             }
         
         return self.save_frame(data)
@@ -221,7 +244,7 @@ class JSONExporter:
                 "lost": model.victims_lost,
                 "damage": model.damage_counters,
                 "pois_active": len(model.scenario["pois"]),
-                "pois_in_deck": len(model.mazo_pois) if hasattr(model, "mazo_pois") else 0
+                "pois_in_deck": len(model.mazo_pois)
             }
         }
         
@@ -265,10 +288,10 @@ class ScenarioParser:
     @staticmethod
     def _parse_grid_walls(lines):
         """Parses the first 6 lines of the scenario to get the walls"""
-        original_grid = np.zeros((6, 8, 4), dtype=int)
-        for i, line in enumerate(lines[:6]):
-            for j, cell in enumerate(line.strip().split()):
-                original_grid[i, j] = [int(d) for d in cell]
+        # Each cell is a 4-digit token (N, E, S, W); decode all 6x8x4 digits in one pass
+        tokens = "".join(" ".join(lines[:6]).split())
+        digits = np.frombuffer(tokens.encode("ascii"), dtype=np.uint8) - ord("0")
+        original_grid = digits.reshape(6, 8, 4).astype(int)
         
         grid = np.zeros((8, 10, 4), dtype=int)
         grid[1:7, 1:9] = original_grid
@@ -293,15 +316,15 @@ class ScenarioParser:
 
     @staticmethod
     def _parse_fires(lines):
-        """Parses the initial fire lines"""
-        fires = []
+        """Parses the initial fire lines into a set of (row, column) cells"""
+        fires = set()
         fire_lines = lines[9:19]  
         for line in fire_lines:
             parts = line.strip().split()
             if len(parts) == 2:
                 row, col = parts
                 row_idx, col_idx = int(row) - 1 + 1, int(col) - 1 + 1
-                fires.append((row_idx, col_idx))
+                fires.add((row_idx, col_idx))
         return fires
 
     @staticmethod
@@ -334,25 +357,44 @@ class ScenarioParser:
     @staticmethod
     def parse_scenario(scenario_text):
         """Main function that parses the entire scenario content"""
-        lines = scenario_text.strip().split('\n')
-        if len(lines) < 31:
+        parsed = ScenarioParser._parse_scenario_cached(scenario_text)
+        if parsed is None:
             return None
         
-        grid = ScenarioParser._parse_grid_walls(lines)
-        pois = ScenarioParser._parse_pois(lines)
-        fires = ScenarioParser._parse_fires(lines)
-        doors = ScenarioParser._parse_doors(lines)
-        entries = ScenarioParser._parse_entries(lines)
+        # The model mutates its scenario, so every caller gets fresh copies of the cached parse
+        grid, pois, fires, doors, entries = parsed
+        
+        # POIs as (row, column) -> type; the first POI listed on a cell wins
+        poi_map = {}
+        for y, x, poi_type in pois:
+            poi_map.setdefault((y, x), poi_type)
         
         scenario = {
-            "grid_walls": grid,
-            "pois": pois,
-            "fires": fires,
-            "doors": doors,
-            "entries": entries
+            "grid_walls": grid.copy(),
+            "pois": poi_map,
+            "fires": set(fires),
+            "doors": list(doors),
+            "entries": list(entries)
         }
         return scenario
     
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _parse_scenario_cached(scenario_text):
+        # Parsed once per distinct scenario text, as read-only pieces
+        lines = scenario_text.strip().split('\n')
+        if len(lines) < 31:
+            return None
+        
+        grid = ScenarioParser._parse_grid_walls(lines)
+        grid.setflags(write=False)
+        pois = tuple(ScenarioParser._parse_pois(lines))
+        fires = frozenset(ScenarioParser._parse_fires(lines))
+        doors = tuple(ScenarioParser._parse_doors(lines))
+        entries = tuple(ScenarioParser._parse_entries(lines))
+        
+        return grid, pois, fires, doors, entries
+    
     @staticmethod
     def compute_door_positions(doors):
         """Calculates door positions for visualization"""
@@ -372,40 +414,161 @@ class ScenarioParser:
         return door_positions
 
     @staticmethod
-    def build_grid_state(scenario):
-        """Builds a grid where each cell is a dictionary with complete state"""
-        rows, columns = scenario["grid_walls"].shape[:2]
+    def build_cell_bits(scenario):
+        """Packs the walls (bits 0-3) and doors (bits 4-7) of every cell into a single byte"""
+        walls = scenario["grid_walls"]
+        cell_bits = np.zeros(walls.shape[:2], dtype=np.uint8)
         
-        grid_state = np.empty((rows, columns), dtype=object)
+        for direction in range(4):
+            cell_bits |= (walls[:, :, direction] != 0).astype(np.uint8) << direction
         
         door_positions = ScenarioParser.compute_door_positions(scenario["doors"])
+        if door_positions:
+            ys, xs, directions = np.array(door_positions).T
+            # bitwise_or.at so two doors on the same cell both keep their bit
+            np.bitwise_or.at(cell_bits, (ys, xs), (1 << (directions + DirectionHelper.DOOR_SHIFT)).astype(np.uint8))
         
-        for y in range(rows):
-            for x in range(columns):
-                walls = scenario["grid_walls"][y, x].tolist()
-                
-                fire = (y, x) in scenario["fires"]
-                
-                door = any((y, x, d) in door_positions for d in range(4))
-                
-                poi = None
-                for p_y, p_x, p_type in scenario["pois"]:
-                    if p_y == y and p_x == x:
-                        poi = p_type
-                        break
-                
-                cell = {
-                    "walls": walls,
-                    "fire": fire,
-                    "smoke": False,
-                    "damage": 0,
-                    "door": door,
-                    "poi": poi
-                }
-                
-                grid_state[y, x] = cell
+        return cell_bits
+
+    @staticmethod
+    def entry_borders(entries, rows, columns):
+        """Returns the closest board edge of every (row, column) entry as an index into (north, south, west, east), ties going to the first"""
+        entries = np.array(entries).reshape(-1, 2)
+        border_dists = np.stack([
+            entries[:, 0],
+            rows - 1 - entries[:, 0],
+            entries[:, 1],
+            columns - 1 - entries[:, 1]
+        ], axis=1)
+        return border_dists.argmin(axis=1).tolist()
+
+    @staticmethod
+    def build_perimeter_mask(rows, columns):
+        """Marks the outer ring of cells that surrounds the playable area"""
+        mask = np.zeros((rows, columns), dtype=bool)
+        mask[0, :] = mask[-1, :] = True
+        mask[:, 0] = mask[:, -1] = True
+        return mask
+
+    @staticmethod
+    def build_perimeter_wall_mask(rows, columns):
+        """Marks, per cell and direction, the walls that face the perimeter and cannot be cut"""
+        mask = np.zeros((rows, columns, 4), dtype=bool)
+        mask[:2, :, 0] = True
+        mask[:, columns - 2:, 1] = True
+        mask[rows - 2:, :, 2] = True
+        mask[:, :2, 3] = True
+        return mask
+
+    @staticmethod
+    def build_neighbor_tables(rows, columns):
+        """Precomputes the (row, column) neighbour of every cell per direction, -1 when off the board"""
+        ys, xs = np.mgrid[:rows, :columns]
+        
+        nbr_y = ys[:, :, None] + DirectionHelper.DYS[None, None, :]
+        nbr_x = xs[:, :, None] + DirectionHelper.DXS[None, None, :]
+        
+        outside = (nbr_y < 0) | (nbr_y >= rows) | (nbr_x < 0) | (nbr_x >= columns)
+        nbr_y[outside] = -1
+        nbr_x[outside] = -1
+        
+        return nbr_y.astype(np.int8), nbr_x.astype(np.int8)
+
+    @staticmethod
+    def build_grid_state(scenario):
+        """Builds the board state as one array per cell field"""
+        rows, columns = scenario["grid_walls"].shape[:2]
+        
+        fire = np.zeros((rows, columns), dtype=bool)
+        if scenario["fires"]:
+            ys, xs = zip(*scenario["fires"])
+            fire[ys, xs] = True
+        
+        poi = np.zeros((rows, columns), dtype=np.int8)
+        for (y, x), poi_type in scenario["pois"].items():
+            poi[y, x] = GridState.POI_CODES[poi_type]
         
-        return grid_state
+        return GridState(
+            ScenarioParser.build_cell_bits(scenario),
+            fire,
+            np.zeros((rows, columns), dtype=bool),
+            poi
+        )
+
+class GridState:
+    """Board state stored as parallel arrays indexed by [row, column]"""
+    
+    POI_NONE = 0
+    POI_VICTIM = 1
+    POI_FALSE_ALARM = 2
+    
+    # POI letters used by the scenario and the JSON output, indexed by POI code
+    POI_TYPES = (None, "v", "f")
+    POI_CODES = {None: POI_NONE, "v": POI_VICTIM, "f": POI_FALSE_ALARM}
+    
+    def __init__(self, bits, fire, smoke, poi):
+        self.bits = bits  # Walls and doors, shared with model.cell_bits
+        self.fire = fire
+        self.smoke = smoke
+        self.poi = poi
+        self.shape = fire.shape
+    
+    def __getitem__(self, pos):
+        """Returns a dictionary-like view of a single cell"""
+        y, x = pos
+        return CellView(self, y, x)
+    
+    def copy(self):
+        """Copies every field array"""
+        return GridState(self.bits.copy(), self.fire.copy(), self.smoke.copy(), self.poi.copy())
+
+class CellView:
+    """Reads and writes one cell of a GridState with the keys of the old per-cell dictionaries"""
+    
+    __slots__ = ("grid", "y", "x")
+    
+    def __init__(self, grid, y, x):
+        self.grid = grid
+        self.y = y
+        self.x = x
+    
+    def __getitem__(self, key):
+        grid, y, x = self.grid, self.y, self.x
+        
+        if key == "fire":
+            return bool(grid.fire[y, x])
+        if key == "smoke":
+            return bool(grid.smoke[y, x])
+        if key == "poi":
+            return GridState.POI_TYPES[grid.poi[y, x]]
+        if key == "walls":
+            bits = int(grid.bits[y, x])
+            return [(bits >> direction) & 1 for direction in range(4)]
+        if key == "door":
+            return bool(grid.bits[y, x] >> DirectionHelper.DOOR_SHIFT)
+        
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        grid, y, x = self.grid, self.y, self.x
+        
+        if key == "fire":
+            grid.fire[y, x] = value
+        elif key == "smoke":
+            grid.smoke[y, x] = value
+        elif key == "poi":
+            grid.poi[y, x] = GridState.POI_CODES[value]
+        else:
+            raise KeyError(key)
+
+class DoorState:
+    # Values of model.door_state. ABSENT covers sides without a door as well as destroyed doors
+    ABSENT = 0
+    CLOSED = 1
+    OPEN = 2
+    
+    # State names used in the JSON output, indexed by value
+    NAMES = ("destroyed", "closed", "open")
 
 class DirectionHelper:
     NORTH = 0
@@ -413,20 +576,14 @@ class DirectionHelper:
     SOUTH = 2
     WEST = 3
     
-    DIRECTIONS = [
-        (0, -1),  
-        (1, 0),   
-        (0, 1),   
-        (-1, 0)   
-    ]
+    # Per-direction column/row deltas as arrays, for vectorized neighbour math; scalar code indexes DX/DY
+    DXS = np.array(DX, dtype=np.int8)
+    DYS = np.array(DY, dtype=np.int8)
     
     DIRECTION_NAMES = ["north", "east", "south", "west"]
     
-    @staticmethod
-    def get_adjacent_position(x, y, direction):
-        """Gets the adjacent position in the specified direction"""
-        dx, dy = DirectionHelper.DIRECTIONS[direction]
-        return x + dx, y + dy
+    # Offset of the door bits inside model.cell_bits (walls use bits 0-3)
+    DOOR_SHIFT = 4
     
     @staticmethod
     def get_opposite_direction(direction):
@@ -436,7 +593,7 @@ class DirectionHelper:
     @staticmethod
     def is_perimeter(model, x, y):
         """Checks if a position is on the perimeter"""
-        return (x == 0 or x == model.grid.width - 1 or y == 0 or y == model.grid.height - 1)
+        return bool(model.perimeter[y, x])
     
     @staticmethod
     def get_wall_key(y, x, direction):
@@ -446,129 +603,100 @@ class DirectionHelper:
     @staticmethod
     def has_wall(model, y, x, direction):
         """Checks if there's a wall in the specified direction"""
-        return model.grid_state[y, x]["walls"][direction] == 1
+        return bool(model.cell_bits[y, x] & (1 << direction))
     
     @staticmethod
     def is_wall_destroyed(model, y, x, direction):
         """Checks if a wall is destroyed (has 2 or more damage points)"""
-        wall_key = DirectionHelper.get_wall_key(y, x, direction)
-        return wall_key in model.wall_damage and model.wall_damage[wall_key] >= 2
+        return model.wall_damage[y, x, direction] >= 2
     
     @staticmethod
     def can_pass_wall(model, y, x, direction):
         """Checks if you can pass through a wall (no wall or it's destroyed)"""
-        return not DirectionHelper.has_wall(model, y, x, direction) or DirectionHelper.is_wall_destroyed(model, y, x, direction)
+        # Destroyed walls are cleared from cell_bits, so a single bit test is enough
+        return not model.cell_bits[y, x] & (1 << direction)
     
     @staticmethod
     def is_door(model, y, x, direction):
         """Checks if there's a door in the specified direction"""
-        door_positions = ScenarioParser.compute_door_positions(model.scenario["doors"])
-        door_key = (y, x, direction)
-        return door_key in door_positions
+        return bool(model.cell_bits[y, x] & (1 << (direction + DirectionHelper.DOOR_SHIFT)))
     
     @staticmethod
     def is_door_open(model, y, x, direction):
         """Verifica específicamente si una puerta está abierta, considerando ambos lados"""
-        door_key = DirectionHelper.get_wall_key(y, x, direction)
-        
-        # Verificar en dirección normal
-        if door_key in model.door_states and model.door_states[door_key] == "open":
-            return True
-        
-        # También verificar desde la otra celda
-        nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
-        opposite_dir = DirectionHelper.get_opposite_direction(direction)
-        
-        # Si es una posición válida
-        if 0 <= ny < model.grid.height and 0 <= nx < model.grid.width:
-            opposite_key = DirectionHelper.get_wall_key(ny, nx, opposite_dir)
-            if opposite_key in model.door_states and model.door_states[opposite_key] == "open":
-                return True
-        
-        # Si no se cumple ninguna condición, la puerta no está abierta
-        return False
+        # door_state se escribe en los dos lados de la puerta, así que basta con una lectura
+        return bool(model.door_state[y, x, direction] == DoorState.OPEN)
 
     @staticmethod
     def get_door_state(model, y, x, direction):
         """Gets the state of a door (open/closed/destroyed)"""
         door_key = (y, x, direction)
         
-        if door_key not in ScenarioParser.compute_door_positions(model.scenario["doors"]):
+        if not model.door_mask[door_key]:
             return None  
         
-        if door_key in model.door_states:
-            return model.door_states[door_key] 
-        else:
-            return "destroyed" 
+        return DoorState.NAMES[model.door_state[door_key]]
     
     @staticmethod
     def is_entry(model, x, y):
         """Checks if a position is an entry point"""
-        return (x, y) in [(e[1], e[0]) for e in model.scenario["entries"]]
+        return (x, y) in model.entries_xy
     
     @staticmethod
     def damage_wall(model, y, x, direction):
         """Adds a damage point to a wall and checks if it gets destroyed"""
-        wall_key = DirectionHelper.get_wall_key(y, x, direction)
-        
-        if wall_key not in model.wall_damage:
-            model.wall_damage[wall_key] = 1
-        else:
-            model.wall_damage[wall_key] += 1
-        
+        damage = int(hit_wall(model.cell_bits, model.open_sides, model.wall_damage, y, x, direction))
+        DirectionHelper.record_wall_damage(model, y, x, direction, damage)
+        return damage >= 2
+    
+    @staticmethod
+    def record_wall_damage(model, y, x, direction, damage):
+        """Counts a damage point already applied to the wall arrays and reports it"""
         model.damage_counters += 1
         
-        if not hasattr(model, 'wall_damage_changes'):
-            model.wall_damage_changes = []
-        
-        nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
+        nx, ny = x + DX[direction], y + DY[direction]
         
         model.wall_damage_changes.append({
             "from": [x, y],
             "to": [nx, ny],
-            "damage": model.wall_damage[wall_key]
+            "damage": damage
         })
         
-        if model.wall_damage[wall_key] >= 2:
-            model.grid_state[y, x]["walls"][direction] = 0
-            
-            
-            opposite_direction = DirectionHelper.get_opposite_direction(direction)
-            
-            if 0 <= ny < model.grid.height and 0 <= nx < model.grid.width:
-                model.grid_state[ny, nx]["walls"][opposite_direction] = 0
-                
-                
-                opposite_key = DirectionHelper.get_wall_key(ny, nx, opposite_direction)
-                model.wall_damage[opposite_key] = model.wall_damage[wall_key]
-                
-            return True  
-        
-        return False  
+        if damage >= 2:
+            model.refresh_passage(y, x, direction)
 
 class GameMechanics:
 
+    @staticmethod
+    def kill_victim(model, y, x):
+        """Removes a victim reached by fire at (y, x) and counts it as lost"""
+        poi = model.grid_state.poi
+        
+        if poi[y, x] != GridState.POI_VICTIM:
+            return False
+        
+        poi[y, x] = GridState.POI_NONE
+        model.victims_lost += 1
+        model.remove_poi(y, x)
+        return True
+
     @staticmethod
     def advance_fire(model):
         """Propagates fire through the scenario according to Flash Point: Fire Rescue rules"""
         rows, cols = model.grid_state.shape
         model.log_action("Iniciando fase de propagación del fuego", "FUEGO")
         
-        if not hasattr(model, 'grid_changes'):
-            model.grid_changes = []
-        if not hasattr(model, 'door_changes'):
-            model.door_changes = []
-        if not hasattr(model, 'wall_damage_changes'):
-            model.wall_damage_changes = []
-        
         random_row = model.random.randint(1, rows-2)
         random_col = model.random.randint(1, cols-2)
         
-        cell = model.grid_state[random_row, random_col]
+        fire = model.grid_state.fire
+        smoke = model.grid_state.smoke
+        cell_fire = fire[random_row, random_col]
+        cell_smoke = smoke[random_row, random_col]
         
         # Case 1: Cell with no fire or smoke -> Add SMOKE
-        if not cell["fire"] and not cell["smoke"]:
-            cell["smoke"] = True
+        if not cell_fire and not cell_smoke:
+            smoke[random_row, random_col] = True
             
             grid_change = {
                 "x": random_col,
@@ -584,16 +712,14 @@ class GameMechanics:
                 grid_changes=[grid_change]
             )
             model.log_action(
-                f"Se generó nuevo HUMO en ({random_col},{random_row}) - Fase de propagación", 
-                "FUEGO"
+                "Se generó nuevo HUMO en (%s,%s) - Fase de propagación", "FUEGO", random_col, random_row
             )
 
         # Case 2: Cell with smoke -> Convert to fire
-        elif not cell["fire"] and cell["smoke"]:
-            cell["fire"] = True
-            cell["smoke"] = False
-            if (random_row, random_col) not in model.scenario["fires"]:
-                model.scenario["fires"].append((random_row, random_col))
+        elif not cell_fire and cell_smoke:
+            fire[random_row, random_col] = True
+            smoke[random_row, random_col] = False
+            model.scenario["fires"].add((random_row, random_col))
 
             grid_change = {
                 "x": random_col,
@@ -612,215 +738,98 @@ class GameMechanics:
             )
             
             # Check if there's a victim in the cell
-            if cell["poi"] == "v":
-                cell["poi"] = None
-                model.victims_lost += 1
-                
+            if GameMechanics.kill_victim(model, random_row, random_col):
                 poi_change = {
                     "x": random_col,
                     "y": random_row,
                     "poi": None
                 }
                 model.grid_changes.append(poi_change)
-                
-                # Update POIs in the scenario
-                for i, poi in enumerate(model.scenario["pois"]):
-                    if poi[0] == random_row and poi[1] == random_col:
-                        model.scenario["pois"].pop(i)
-                        break
             model.log_action(
-                f"HUMO convertido a FUEGO en ({random_col},{random_row}) - Fase de propagación", 
-                "FUEGO"
+                "HUMO convertido a FUEGO en (%s,%s) - Fase de propagación", "FUEGO", random_col, random_row
             )
         
         # Case 3: Cell with fire -> EXPLOSION
-        elif cell["fire"]:
+        elif cell_fire:
             for direction in range(4):
                 GameMechanics.propagate_explosion(model, random_row, random_col, direction)
         
-        new_fires = []
-        new_smokes = []
-        grid_changes_flashover = []
+
+        # Detect fire propagation: cells next to a burning cell through an open side
+        if HAVE_NUMBA:
+            # The compiled kernel fills the preallocated masks in one pass over the board
+            flashover_mask = model.spread_flashover
+            smoke_mask = model.spread_smoke
+            if not spread_fire(fire, smoke, model.open_sides, model.interior, flashover_mask, smoke_mask):
+                # Nothing new reached, nothing to report or apply
+                return
+        else:
+            # Nothing burning, nothing to spread
+            if not fire.any():
+                return
+            # Without numba the kernel would be a per-cell Python loop, so use one shifted slice per
+            # direction over the whole board instead
+            reached = np.zeros_like(fire)
+            for direction, (dx, dy) in enumerate(zip(DX, DY)):
+                source = fire & model.open_sides[:, :, direction]
+                reached[max(dy, 0):rows + min(dy, 0), max(dx, 0):cols + min(dx, 0)] |= \
+                    source[max(-dy, 0):rows + min(-dy, 0), max(-dx, 0):cols + min(-dx, 0)]
+            reached &= model.interior
+            reached &= ~fire
+            if not reached.any():
+                # Nothing new reached, nothing to report or apply
+                return
+            flashover_mask = reached & smoke
+            smoke_mask = reached & ~smoke
+        
+        fire_ys, fire_xs = np.nonzero(flashover_mask)
+        fire_ys, fire_xs = fire_ys.tolist(), fire_xs.tolist()
+        smoke_ys, smoke_xs = np.nonzero(smoke_mask)
+        
+        grid_changes_flashover = [
+            {"x": x, "y": y, "fire": True, "smoke": False} for y, x in zip(fire_ys, fire_xs)
+        ] + [
+            {"x": x, "y": y, "smoke": True} for y, x in zip(smoke_ys.tolist(), smoke_xs.tolist())
+        ]
+        
+        model.json_exporter.action_frame(
+            model,
+            -1,
+            "flashover",
+            message="Flashover: smoke adjacent to fire converted to fire",
+            grid_changes=grid_changes_flashover
+        )
+        model.log_action(
+            "FLASHOVER: %s casillas de humo convertidas a fuego, %s casillas con nuevo humo", "FUEGO", len(fire_ys), len(smoke_ys)
+        )
         
-        # Detect fire propagation
-        for y in range(rows):
-            for x in range(cols):
-                if model.grid_state[y, x]["fire"]:
-                    for direction in range(4):
-                        if DirectionHelper.can_pass_wall(model, y, x, direction):
-                            nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
-                            
-                            if 0 <= ny < rows and 0 <= nx < cols:
-                                if not DirectionHelper.is_perimeter(model, nx, ny):
-                                    if not model.grid_state[ny, nx]["fire"]:
-                                        if model.grid_state[ny, nx]["smoke"]:
-                                            new_fires.append((ny, nx))
-                                            grid_changes_flashover.append({
-                                                "x": nx,
-                                                "y": ny,
-                                                "fire": True,
-                                                "smoke": False
-                                            })
-                                        elif not model.grid_state[ny, nx]["smoke"]:
-                                            new_smokes.append((ny, nx))
-                                            grid_changes_flashover.append({
-                                                "x": nx,
-                                                "y": ny,
-                                                "smoke": True
-                                            })
-        
-        if grid_changes_flashover:
-            model.json_exporter.action_frame(
-                model,
-                -1,
-                "flashover",
-                message="Flashover: smoke adjacent to fire converted to fire",
-                grid_changes=grid_changes_flashover
-            )
-            model.log_action(
-                f"FLASHOVER: {len(new_fires)} casillas de humo convertidas a fuego, {len(new_smokes)} casillas con nuevo humo", 
-                "FUEGO"
-            )
-        
-        # Apply the detected changes - first apply the new fires
-        for y, x in new_fires:
-            model.grid_state[y, x]["fire"] = True
-            model.grid_state[y, x]["smoke"] = False
-            fire_pos = (y, x)
-            if fire_pos not in model.scenario["fires"]:
-                model.scenario["fires"].append(fire_pos)
-            
-            # Check if there's a victim in the cell
-            if model.grid_state[y, x]["poi"] == "v":
-                model.grid_state[y, x]["poi"] = None
-                model.victims_lost += 1
-                
-                # Update POIs in the scenario
-                for i, poi in enumerate(model.scenario["pois"]):
-                    if poi[0] == y and poi[1] == x:
-                        model.scenario["pois"].pop(i)
-                        break
+        # Apply the detected changes in place - first the new fires
+        fire |= flashover_mask
+        smoke &= ~flashover_mask
+        model.scenario["fires"].update(zip(fire_ys, fire_xs))
+        
+        # Victims caught by the new fires, cleared and counted in one pass
+        poi = model.grid_state.poi
+        victim_hit_mask = flashover_mask & (poi == GridState.POI_VICTIM)
+        if victim_hit_mask.any():
+            poi[victim_hit_mask] = GridState.POI_NONE
+            ys, xs = np.nonzero(victim_hit_mask)
+            model.victims_lost += len(ys)
+            for y, x in zip(ys.tolist(), xs.tolist()):
+                model.remove_poi(y, x)
         
         # Apply new smokes
-        for y, x in new_smokes:
-            if (y, x) not in new_fires:  # Avoid duplicates
-                model.grid_state[y, x]["smoke"] = True
+        smoke |= smoke_mask
 
     @staticmethod
     def propagate_explosion(model, row, col, direction):
         """Propagates an explosion in the specified direction until finding an obstacle"""
-        rows, cols = model.grid_state.shape
-        
-        dx, dy = DirectionHelper.DIRECTIONS[direction]
-        dir_name = DirectionHelper.DIRECTION_NAMES[direction]
-        
-        if direction == DirectionHelper.NORTH:
-            door_positions = ScenarioParser.compute_door_positions(model.scenario["doors"])
-            
-            for dir_check in range(4):
-                door = (row, col, dir_check)
-                if door in door_positions:
-                    if door in model.door_states:
-                        old_state = model.door_states[door]
-                        del model.door_states[door]
-                        
-                        
-                        for (r1, c1), (r2, c2) in model.scenario["doors"]:
-                            door_key1 = DirectionHelper.get_wall_key(r1, c1, dir_check)
-                            door_key2 = DirectionHelper.get_wall_key(r2, c2, dir_check)
-                            
-                            if door == door_key1 or door == door_key2:
-                                model.door_changes.append({
-                                    "from": [c1, r1],
-                                    "to": [c2, r2], 
-                                    "state": "destroyed"  
-                                })
-                                break
-                        
-                        model.log_action(f"Door destroyed by explosion at ({col},{row}) in direction {DirectionHelper.DIRECTION_NAMES[dir_check]}")
-        
-        # Start propagation
-        x, y = col, row
-        wall_found = False
-        
-        while not wall_found:
-            # Calculate new position
-            new_x, new_y = x + dx, y + dy
-            
-            # Check if within limits
-            if new_y < 0 or new_y >= rows or new_x < 0 or new_x >= cols:
-                break
-                
-            # Check if in perimeter
-            if DirectionHelper.is_perimeter(model, new_x, new_y):
-                break
-            
-            # Check for door in path
-            door_positions = ScenarioParser.compute_door_positions(model.scenario["doors"])
-            door_in_path = (y, x, direction)
-                
-            if door_in_path in door_positions:
-                if door_in_path in model.door_states:
-                    old_state = model.door_states[door_in_path]
-                    del model.door_states[door_in_path]
-                    
-                    # Buscar las coordenadas de la puerta para el JSON
-                    for (r1, c1), (r2, c2) in model.scenario["doors"]:
-                        door_key1 = DirectionHelper.get_wall_key(r1, c1, direction)
-                        door_key2 = DirectionHelper.get_wall_key(r2, c2, direction)
-                        
-                        if door_in_path == door_key1 or door_in_path == door_key2:
-                            model.door_changes.append({
-                                "from": [c1, r1],
-                                "to": [c2, r2], 
-                                "state": "destroyed"  # Las puertas dañadas por explosión se destruyen
-                            })
-                            break
-            
-            # Check for wall in path
-            has_wall = DirectionHelper.has_wall(model, y, x, direction)
-            wall_key = DirectionHelper.get_wall_key(y, x, direction)
-            wall_destroyed = DirectionHelper.is_wall_destroyed(model, y, x, direction)
-                
-            if has_wall and not wall_destroyed:
-                wall_destroyed = DirectionHelper.damage_wall(model, y, x, direction)
-                
-                if not wall_destroyed:
-                    wall_found = True
-                    break
-            
-            # If no wall or wall destroyed, continue propagation
-            if not has_wall or wall_destroyed:
-                x, y = new_x, new_y
-                cell = model.grid_state[y, x]
-                
-                # Check for victim in cell
-                if cell["poi"] == "v":
-                    cell["poi"] = None
-                    model.victims_lost += 1
-                    
-                    # Update POIs in the scenario
-                    for i, poi in enumerate(model.scenario["pois"]):
-                        if poi[0] == y and poi[1] == x:
-                            model.scenario["pois"].pop(i)
-                            break
-                
-                # Process fire/smoke effects
-                if cell["smoke"]:
-                    cell["smoke"] = False
-                    cell["fire"] = True
-                    if (y, x) not in model.scenario["fires"]:
-                        model.scenario["fires"].append((y, x))
-                
-                elif not cell["fire"]:
-                    cell["fire"] = True
-                    if (y, x) not in model.scenario["fires"]:
-                        model.scenario["fires"].append((y, x))
-                
-                else:
-                    # If already fire, create shockwave
-                    GameMechanics.shockwave(model, y, x, direction)
-                    break
+        grid = model.grid_state
+        n = explosion_ray(
+            row, col, direction, grid.fire, grid.smoke, grid.poi, model.cell_bits, model.open_sides,
+            model.wall_damage, model.perimeter, model.door_mask, model.door_state, model.blast_events
+        )
+        GameMechanics.apply_blast_events(model, n)
 
     @staticmethod
     def shockwave(model, row, col, direction):
@@ -828,149 +837,102 @@ class GameMechanics:
         Propagates a shockwave in the specified direction
         when an explosion reaches a cell that already has fire
         """
-        rows, cols = model.grid_state.shape
-        
-        dx, dy = DirectionHelper.DIRECTIONS[direction]
-        
-        # Start propagation
-        x, y = col, row
-        stopped = False
-        
-        while not stopped:
-            # Calculate new position
-            new_x, new_y = x + dx, y + dy
-            x, y = new_x, new_y
+        grid = model.grid_state
+        n = shockwave_ray(
+            row, col, direction, grid.fire, grid.smoke, grid.poi, model.cell_bits, model.open_sides,
+            model.wall_damage, model.perimeter, model.door_mask, model.blast_events, 0
+        )
+        GameMechanics.apply_blast_events(model, n)
+
+    @staticmethod
+    def apply_blast_events(model, n):
+        """Does the bookkeeping for the first n events an explosion or shockwave kernel wrote"""
+        for kind, y, x, direction, value in model.blast_events[:n].tolist():
+            if kind == EVENT_FIRE:
+                model.scenario["fires"].add((y, x))
             
-            # Check if within limits
-            if y < 0 or y >= rows or x < 0 or x >= cols:
-                break
+            elif kind == EVENT_VICTIM:
+                model.victims_lost += 1
+                model.remove_poi(y, x)
             
-            # Check for door in path
-            door_key = (y-dy, x-dx, direction)
-            door_positions = ScenarioParser.compute_door_positions(model.scenario["doors"])
+            elif kind == EVENT_WALL:
+                DirectionHelper.record_wall_damage(model, y, x, direction, value)
             
-            if door_key in door_positions:
-                if door_key in model.door_states:
-                    door_state = model.door_states[door_key]
-                    if door_state == "cerrada":  # "closed"
-                        del model.door_states[door_key]
-                else:
-                    pass # Door already destroyed
             else:
-                # Check for wall in path
-                has_wall = DirectionHelper.has_wall(model, y-dy, x-dx, direction)
+                # Door destroyed, by the blast on its own cell or in the explosion path
+                model.refresh_passage(y, x, direction)
                 
-                if has_wall:
-                    wall_destroyed = DirectionHelper.is_wall_destroyed(model, y-dy, x-dx, direction)
-                    
-                    if wall_destroyed:
-                        pass # Continue through destroyed wall
-                    else:
-                        # Damage wall
-                        wall_key = DirectionHelper.get_wall_key(y-dy, x-dx, direction)
-                        DirectionHelper.damage_wall(model, y-dy, x-dx, direction)
-                        
-                        if wall_key in model.wall_damage:
-                            damage = model.wall_damage[wall_key]
-                        else:
-                            damage = 1
-                            
-                        if damage < 2:
-                            stopped = True
-                            break
-            
-            # Check if in perimeter
-            if DirectionHelper.is_perimeter(model, x, y):
-                break
-            
-            # Process cell effects
-            cell = model.grid_state[y, x]
-            
-            # Check for victim in cell
-            if cell["poi"] == "v":
-                cell["poi"] = None
-                model.victims_lost += 1
+                # Coordenadas de la puerta para el JSON
+                door = model.door_at_cell.get((y, x))
+                if door is not None:
+                    (r1, c1), (r2, c2) = door
+                    model.door_changes.append({
+                        "from": [c1, r1],
+                        "to": [c2, r2], 
+                        "state": "destroyed"  # Las puertas dañadas por explosión se destruyen
+                    })
                 
-                # Update POIs in scenario
-                for i, poi in enumerate(model.scenario["pois"]):
-                    if poi[0] == y and poi[1] == x:
-                        model.scenario["pois"].pop(i)
-                        break
-            
-            # Update cell state based on fire/smoke
-            if cell["fire"]:
-                # Continue through cells with fire
-                pass
-            elif cell["smoke"]:
-                # Convert smoke to fire and stop
-                cell["smoke"] = False
-                cell["fire"] = True
-                if (y, x) not in model.scenario["fires"]:
-                    model.scenario["fires"].append((y, x))
-                stopped = True
-            else:
-                # Place fire and stop
-                cell["fire"] = True
-                if (y, x) not in model.scenario["fires"]:
-                    model.scenario["fires"].append((y, x))
-                stopped = True
+                if kind == EVENT_DOOR_BLAST:
+                    model.log_action("Door destroyed by explosion at (%s,%s) in direction %s", "INFO", x, y, DirectionHelper.DIRECTION_NAMES[direction])
 
     @staticmethod
     def check_firefighters_in_fire(model):
         """Checks if there are firefighters in cells with fire and sends them to ambulance"""
-        rows, cols = model.grid_state.shape
-        injured_firefighters = []
-        
         # Ambulance position
         ambulance_pos = (9, 0)
         
-        # Find firefighters in cells with fire
-        for y in range(rows):
-            for x in range(cols):
-                if model.grid_state[y, x]["fire"]:
-                    cell_contents = model.grid.get_cell_list_contents((x, y))
-                    firefighters = [agent for agent in cell_contents if isinstance(agent, FirefighterAgent)]
-                    
-                    for ff in firefighters:
-                        injured_firefighters.append(ff)
-        
-        if not injured_firefighters:
-            return
-        
-        # Process injured firefighters
-        for ff in injured_firefighters:
-            original_pos = (ff.pos[0], ff.pos[1])
-            model.log_action(
-                f"¡ALERTA! Bombero {ff.unique_id} ha sido derribado por el fuego en ({ff.pos[0]}, {ff.pos[1]}). Trasladado a la ambulancia.",
-                "KNOCKDOWN"
-            )
-            
-            # Si carrying victim, the victim is lost
-            if ff.carrying:
-                ff.carrying = False
-                model.victims_lost += 1
-                model.log_action(f"Firefighter {ff.unique_id} lost victim due to knockdown")
-                # Replenish POI when victim lost
-                GameMechanics.replenish_pois(model)
-            
-            # Move to ambulance and log action
-            model.grid.remove_agent(ff)
-            model.grid.place_agent(ff, ambulance_pos)
-            model.log_action(f"Firefighter {ff.unique_id} knocked down and moved to ambulance")
+        # Walk the burning cells in board order and send their firefighters away as they are found.
+        # The cells are taken up front, so fire removed by a POI replenish does not spare anyone
+        fire_ys, fire_xs = np.nonzero(model.grid_state.fire)
+        by_cell = model.firefighters_by_cell
+        for y, x in zip(fire_ys.tolist(), fire_xs.tolist()):
+            occupants = by_cell.get((x, y))
+            if not occupants:
+                continue
             
-            # Reduce AP to 0
-            ff.ap = 0
+            # Copy before dispatching: move_firefighter edits the occupant list
+            injured = list(occupants)
+            if len(injured) > 1:
+                injured.sort(key=model.firefighters.index)
             
-            # Crear un frame específico para el knockdown
-            model.json_exporter.action_frame(
-                model,
-                ff.unique_id,
-                "knockdown",
-                message=f"Firefighter {ff.unique_id} knocked down by fire",
-                knockdown_coords=original_pos,
-                ambulance_pos=[ambulance_pos[0], ambulance_pos[1]],
-                grid_changes=[]
-            )
+            for ff in injured:
+                original_pos = (x, y)
+                model.log_action(
+                    "¡ALERTA! Bombero %s ha sido derribado por el fuego en (%s, %s). Trasladado a la ambulancia.", "KNOCKDOWN", ff.unique_id, x, y
+                )
+                
+                # Si carrying victim, the victim is lost
+                if ff.carrying:
+                    ff.carrying = False
+                    model.victims_lost += 1
+                    model.log_action("Firefighter %s lost victim due to knockdown", "INFO", ff.unique_id)
+                    # Replenish POI when victim lost
+                    GameMechanics.replenish_pois(model)
+                
+                # Move to ambulance and log action
+                model.move_firefighter(ff, ambulance_pos)
+                model.log_action("Firefighter %s knocked down and moved to ambulance", "INFO", ff.unique_id)
+                
+                # Reduce AP to 0
+                ff.ap = 0
+                
+                # Crear un frame específico para el knockdown
+                model.json_exporter.action_frame(
+                    model,
+                    ff.unique_id,
+                    "knockdown",
+                    message=f"Firefighter {ff.unique_id} knocked down by fire",
+                    knockdown_coords=original_pos,
+                    ambulance_pos=[ambulance_pos[0], ambulance_pos[1]],
+                    grid_changes=[]
+                )
+
+    @staticmethod
+    def shuffle_poi_deck(model, cards):
+        """Shuffles the POI cards into model.mazo_pois, a deque drawn from the front with popleft()"""
+        cards = list(cards)
+        model.random.shuffle(cards)
+        model.mazo_pois = deque(cards)
 
     @staticmethod
     def replenish_pois(model):
@@ -979,26 +941,29 @@ class GameMechanics:
         poi_changes = []
         grid_changes = []
 
-        model.log_action(f"Iniciando reposición de POIs: {current_pois_count}/3 activos actualmente", "POI")
+        model.log_action("Iniciando reposición de POIs: %s/3 activos actualmente", "POI", current_pois_count)
 
         if current_pois_count >= 3:
-            model.log_action(f"Ya hay {current_pois_count} POIs activos, no se necesita reposición", "POI")
+            model.log_action("Ya hay %s POIs activos, no se necesita reposición", "POI", current_pois_count)
             return
         
         pois_to_add = 3 - current_pois_count
-        model.log_action(f"Intentando reponer {pois_to_add} POIs", "POI")
-        # Initialize POI deck if needed or if it's empty
-        if not hasattr(model, "mazo_pois") or len(model.mazo_pois) == 0:
-            initial_victims_count = sum(1 for poi in model.scenario["pois"] if poi[2] == "v")
-            initial_false_alarms_count = sum(1 for poi in model.scenario["pois"] if poi[2] == "f")
+        model.log_action("Intentando reponer %s POIs", "POI", pois_to_add)
+        # Fill the POI deck when it is empty (it starts empty, see FireRescueModel.__init__)
+        if not model.mazo_pois:
+            initial_victims_count = sum(1 for poi_type in model.scenario["pois"].values() if poi_type == "v")
+            initial_false_alarms_count = sum(1 for poi_type in model.scenario["pois"].values() if poi_type == "f")
             
             remaining_victims = max(0, 10 - initial_victims_count)
             remaining_false_alarms = max(0, 5 - initial_false_alarms_count)
             
-            model.mazo_pois = ["v"] * remaining_victims + ["f"] * remaining_false_alarms
-            model.random.shuffle(model.mazo_pois)
+            GameMechanics.shuffle_poi_deck(model, ["v"] * remaining_victims + ["f"] * remaining_false_alarms)
             
-            model.log_action(f"POI deck initialized with {remaining_victims} victims and {remaining_false_alarms} false alarms")
+            model.log_action("POI deck initialized with %s victims and %s false alarms", "INFO", remaining_victims, remaining_false_alarms)
+        
+        # Interior cells with at least one open side can take a POI (cells walled on all sides are
+        # unreachable; destroyed walls are already open). Placing POIs does not change this
+        open_interior = model.interior & model.open_sides.any(axis=2)
         
         # Add new POIs
         pois_added = 0
@@ -1007,36 +972,17 @@ class GameMechanics:
                 model.log_action("POI deck is empty, no more POIs can be added")
                 break
             
-            poi_type = model.mazo_pois.pop(0)
+            poi_type = model.mazo_pois.popleft()
             
-            # Get all valid cells first
-            valid_cells = []
-            rows, cols = model.grid_state.shape
-            
-            for row in range(1, rows-1):
-                for col in range(1, cols-1):
-                    # Skip cells that already have POIs
-                    if model.grid_state[row, col]["poi"] is not None:
-                        continue
-                        
-                    # Skip cells with walls on all sides (unreachable)
-                    has_access = False
-                    for direction in range(4):
-                        if not DirectionHelper.has_wall(model, row, col, direction) or DirectionHelper.is_wall_destroyed(model, row, col, direction):
-                            has_access = True
-                            break
-                    
-                    if not has_access:
-                        continue
-                    
-                    # Add to valid cells list
-                    valid_cells.append((row, col))
+            # Get all valid cells first: open interior cells without a POI
+            ys, xs = np.nonzero(open_interior & (model.grid_state.poi == GridState.POI_NONE))
+            valid_cells = list(zip(ys.tolist(), xs.tolist()))
             
             # If no valid cells found
             if not valid_cells:
                 model.mazo_pois.append(poi_type)
-                model.random.shuffle(model.mazo_pois)
-                model.log_action(f"No valid cells found for POI placement, returned {poi_type} to deck")
+                GameMechanics.shuffle_poi_deck(model, model.mazo_pois)
+                model.log_action("No valid cells found for POI placement, returned %s to deck", "INFO", poi_type)
                 continue
                 
             # Shuffle the valid cells to add randomness
@@ -1046,33 +992,31 @@ class GameMechanics:
             placed = False
             for row, col in valid_cells:
                 # Skip if another POI already exists
-                if model.grid_state[row, col]["poi"] is not None:
+                if model.grid_state.poi[row, col]:
                     continue
                     
                 # Check for firefighter in cell
-                cell_contents = model.grid.get_cell_list_contents((col, row))
-                firefighters = [agent for agent in cell_contents if isinstance(agent, FirefighterAgent)]
+                firefighters = model.firefighters_by_cell.get((col, row), ())
                 
                 # If firefighter and false alarm, skip this cell
                 if firefighters and poi_type == "f":
                     continue
                 
                 # Remove fire/smoke if present
-                if model.grid_state[row, col]["fire"]:
-                    model.grid_state[row, col]["fire"] = False
-                    if (row, col) in model.scenario["fires"]:
-                        model.scenario["fires"].remove((row, col))
+                if model.grid_state.fire[row, col]:
+                    model.grid_state.fire[row, col] = False
+                    model.scenario["fires"].discard((row, col))
                     grid_changes.append({"x": col, "y": row, "fire": False, "smoke": False})
-                    model.log_action(f"Fire removed for POI placement at ({col},{row})")
+                    model.log_action("Fire removed for POI placement at (%s,%s)", "INFO", col, row)
                 
-                if model.grid_state[row, col]["smoke"]:
-                    model.grid_state[row, col]["smoke"] = False
+                if model.grid_state.smoke[row, col]:
+                    model.grid_state.smoke[row, col] = False
                     grid_changes.append({"x": col, "y": row, "smoke": False})
-                    model.log_action(f"Smoke removed for POI placement at ({col},{row})")
+                    model.log_action("Smoke removed for POI placement at (%s,%s)", "INFO", col, row)
                 
                 # Place POI
-                model.grid_state[row, col]["poi"] = poi_type
-                model.scenario["pois"].append((row, col, poi_type))
+                model.grid_state.poi[row, col] = GridState.POI_CODES[poi_type]
+                model.add_poi(row, col, poi_type)
                 
                 poi_change = {
                     "x": col,
@@ -1081,31 +1025,31 @@ class GameMechanics:
                 }
                 poi_changes.append(poi_change)
                 
-                model.log_action(f"New POI ({poi_type}) placed at ({col},{row}). Remaining in deck: {len(model.mazo_pois)}")
+                model.log_action("New POI (%s) placed at (%s,%s). Remaining in deck: %s", "INFO", poi_type, col, row, len(model.mazo_pois))
                 
                 # Handle immediate discovery by firefighter
                 if firefighters and poi_type == "v":
                     for ff in firefighters:
                         if not ff.carrying:
                             ff.carrying = True
-                            model.grid_state[row, col]["poi"] = None
-                            model.scenario["pois"].remove((row, col, poi_type))
-                            model.log_action(f"Firefighter {ff.unique_id} immediately found victim at ({col},{row})")
+                            model.grid_state.poi[row, col] = GridState.POI_NONE
+                            model.remove_poi(row, col)
+                            model.log_action("Firefighter %s immediately found victim at (%s,%s)", "INFO", ff.unique_id, col, row)
                             break
                 
                 placed = True
                 pois_added += 1
-                model.log_action(f"IMPORTANTE: Solo colocando 1 POI de los {pois_to_add} necesarios debido al break", "POI")
+                model.log_action("IMPORTANTE: Solo colocando 1 POI de los %s necesarios debido al break", "POI", pois_to_add)
                 break
                 
             if not placed:
                 model.mazo_pois.append(poi_type)
-                model.random.shuffle(model.mazo_pois)
-                model.log_action(f"Could not place POI, returned {poi_type} to deck")
+                GameMechanics.shuffle_poi_deck(model, model.mazo_pois)
+                model.log_action("Could not place POI, returned %s to deck", "INFO", poi_type)
         
-        model.log_action(f"Encontradas {len(valid_cells)} celdas válidas para colocar POIs", "POI")
+        model.log_action("Encontradas %s celdas válidas para colocar POIs", "POI", len(valid_cells))
         if len(valid_cells) == 0:
-            model.log_action(f"ALERTA: No hay celdas disponibles para colocar POIs", "POI")
+            model.log_action("ALERTA: No hay celdas disponibles para colocar POIs", "POI")
 
 
         if poi_changes:
@@ -1118,7 +1062,7 @@ class GameMechanics:
                 pois=poi_changes
             )
 
-        model.log_action(f"Resultado final: {len(model.scenario['pois'])}/3 POIs activos después de reposición", "POI")
+        model.log_action("Resultado final: %s/3 POIs activos después de reposición", "POI", len(model.scenario['pois']))
         return pois_added > 0
 
 
@@ -1130,23 +1074,16 @@ class GameMechanics:
         Returns:
             bool: True if game has ended, False if it continues
         """
-        # Victory condition: 7+ rescued victims
-        if model.victims_rescued >= 7:
+        # Victory (7+ rescued) or defeat (4+ lost, 24+ damage) is flagged by the counter setters
+        # when the counter is written, so there is nothing to compare here
+        if model.end_reached:
             model.simulation_over = True
-            return True
-            
-        # Defeat by lost victims: 4+ victims
-        elif model.victims_lost >= 4:
-            model.simulation_over = True
-            return True
-            
-        # Defeat by structural collapse: 24+ damage
-        elif model.damage_counters >= 24:
-            model.simulation_over = True
-            return True
-            
-        # Game continues
-        return False
+        return model.simulation_over
+
+class ExtinguishAction:
+    FIRE = 0
+    CONVERT = 1
+    SMOKE = 2
 
 class FirefighterAgent(Agent):
     """Firefighter agent that rescues victims from the fire"""
@@ -1159,93 +1096,161 @@ class FirefighterAgent(Agent):
         self.assigned_entry = None
         self.direction = None
         self.max_ap = 8
+        # Pool of pre-sampled random integers consumed by the action choice loop
+        self._rng_pool = []
+        self._rng_cursor = 0
+        # Set by every state-changing action so step() rebuilds its candidate actions
+        self._local_dirty = True
+        # Filled by valid_moves with up to one (x, y, ap_cost) row per direction
+        self._moves = np.empty((4, 3), dtype=np.int32)
+        # Filled by candidate_actions with the action codes and open neighbours of the current cell
+        self._actions = np.empty(MAX_ACTIONS, dtype=np.int8)
+        self._adjacent = np.empty((4, 2), dtype=np.int8)
+    
+    # Action points and carried victim live in the model's per-firefighter arrays, indexed by unique_id
+    @property
+    def ap(self):
+        return self.model._ap.item(self.unique_id)
+    
+    @ap.setter
+    def ap(self, value):
+        self.model._ap[self.unique_id] = value
+    
+    @property
+    def max_ap(self):
+        return self.model._max_ap.item(self.unique_id)
+    
+    @max_ap.setter
+    def max_ap(self, value):
+        self.model._max_ap[self.unique_id] = value
+    
+    @property
+    def carrying(self):
+        return self.model._carrying.item(self.unique_id)
     
-    def extinguish_fire(self, cell_y, cell_x, type="fire"):
+    @carrying.setter
+    def carrying(self, value):
+        self.model._carrying[self.unique_id] = value
+    
+    def _draw_index(self, n):
+        """Draws an index in [0, n) from the pre-sampled pool, refilling it in one call when exhausted"""
+        if self._rng_cursor >= len(self._rng_pool):
+            self._rng_pool = self.model.rng.integers(0, 1 << 30, size=64).tolist()
+            self._rng_cursor = 0
+        
+        value = self._rng_pool[self._rng_cursor]
+        self._rng_cursor += 1
+        return value % n
+    
+    def extinguish_fire(self, cell_y, cell_x, type=ExtinguishAction.FIRE):
         """Attempts to extinguish fire or smoke in a specific cell"""
-        cell = self.model.grid_state[cell_y, cell_x]
+        return self._EXTINGUISH_HANDLERS[type](self, cell_y, cell_x)
+
+    def _extinguish(self, cell_y, cell_x):
+        """Removes the fire in a cell for 2 AP"""
+        grid_state = self.model.grid_state
         
-        if type == "fire" and cell["fire"]:
-            if self.ap >= 2:
-                cell["fire"] = False
-                if (cell_y, cell_x) in self.model.scenario["fires"]:
-                    self.model.scenario["fires"].remove((cell_y, cell_x))
-                ap_before = self.ap
-                self.ap -= 2
+        if grid_state.fire[cell_y, cell_x] and self.ap >= 2:
+            grid_state.fire[cell_y, cell_x] = False
+            self.model.scenario["fires"].discard((cell_y, cell_x))
+            ap_before = self.ap
+            self.ap -= 2
 
-                grid_changes = [{"x": cell_x, "y": cell_y, "fire": False, "smoke": False}]
-                
-                self.model.json_exporter.action_frame(
-                    self.model,
-                    self.unique_id,
-                    "extinguish_fire",
-                    ap_before=ap_before,
-                    ap_after=self.ap,
-                    target=[cell_x, cell_y],
-                    grid_changes=grid_changes
-                )
-                
-                self.model.log_action(
-                    f"Bombero {self.unique_id} apagó fuego en ({cell_x}, {cell_y}) | AP: -{2} → {self.ap} restantes", 
-                    "EXTINCIÓN"
-                )
+            grid_changes = [{"x": cell_x, "y": cell_y, "fire": False, "smoke": False}]
+            
+            self.model.json_exporter.action_frame(
+                self.model,
+                self.unique_id,
+                "extinguish_fire",
+                ap_before=ap_before,
+                ap_after=self.ap,
+                target=[cell_x, cell_y],
+                grid_changes=grid_changes
+            )
+            
+            self.model.log_action(
+                "Bombero %s apagó fuego en (%s, %s) | AP: -2 → %s restantes", "EXTINCIÓN", self.unique_id, cell_x, cell_y, self.ap
+            )
 
-                return True
+            self._local_dirty = True
+            return True
         
-        elif type == "convert" and cell["fire"]:
-            if self.ap >= 1:
-                ap_before = self.ap
-                cell["fire"] = False
-                cell["smoke"] = True
-                if (cell_y, cell_x) in self.model.scenario["fires"]:
-                    self.model.scenario["fires"].remove((cell_y, cell_x))
-                self.ap -= 1
-                
-                grid_changes = [{"x": cell_x, "y": cell_y, "fire": False, "smoke": True}]
-                
-                self.model.json_exporter.action_frame(
-                    self.model,
-                    self.unique_id,
-                    "convert_to_smoke",
-                    ap_before=ap_before,
-                    ap_after=self.ap,
-                    target=[cell_x, cell_y],
-                    grid_changes=grid_changes
-                )
-                
-                self.model.log_action(
-                    f"Bombero {self.unique_id} convirtió fuego a humo en ({cell_x}, {cell_y}) | AP: -{1} → {self.ap} restantes", 
-                    "EXTINCIÓN"
-                )
+        return False
 
-                return True
+    def _convert_to_smoke(self, cell_y, cell_x):
+        """Turns the fire in a cell into smoke for 1 AP"""
+        grid_state = self.model.grid_state
         
-        elif type == "smoke" and cell["smoke"]:
-            if self.ap >= 1:
-                ap_before = self.ap
-                cell["smoke"] = False
-                self.ap -= 1
-                
-                grid_changes = [{"x": cell_x, "y": cell_y, "smoke": False}]
-                
-                self.model.json_exporter.action_frame(
-                    self.model,
-                    self.unique_id,
-                    "remove_smoke",
-                    ap_before=ap_before,
-                    ap_after=self.ap,
-                    target=[cell_x, cell_y],
-                    grid_changes=grid_changes
-                )
-                
-                self.model.log_action(
-                    f"Bombero {self.unique_id} eliminó humo en ({cell_x}, {cell_y}) | AP: -{1} → {self.ap} restantes", 
-                    "EXTINCIÓN"
-                )
-                return True
-            return False
+        if grid_state.fire[cell_y, cell_x] and self.ap >= 1:
+            ap_before = self.ap
+            grid_state.fire[cell_y, cell_x] = False
+            grid_state.smoke[cell_y, cell_x] = True
+            self.model.scenario["fires"].discard((cell_y, cell_x))
+            self.ap -= 1
+            
+            grid_changes = [{"x": cell_x, "y": cell_y, "fire": False, "smoke": True}]
+            
+            self.model.json_exporter.action_frame(
+                self.model,
+                self.unique_id,
+                "convert_to_smoke",
+                ap_before=ap_before,
+                ap_after=self.ap,
+                target=[cell_x, cell_y],
+                grid_changes=grid_changes
+            )
+            
+            self.model.log_action(
+                "Bombero %s convirtió fuego a humo en (%s, %s) | AP: -1 → %s restantes", "EXTINCIÓN", self.unique_id, cell_x, cell_y, self.ap
+            )
+
+            self._local_dirty = True
+            return True
         
         return False
 
+    def _remove_smoke(self, cell_y, cell_x):
+        """Removes the smoke in a cell for 1 AP"""
+        grid_state = self.model.grid_state
+        
+        if grid_state.smoke[cell_y, cell_x] and self.ap >= 1:
+            ap_before = self.ap
+            grid_state.smoke[cell_y, cell_x] = False
+            self.ap -= 1
+            
+            grid_changes = [{"x": cell_x, "y": cell_y, "smoke": False}]
+            
+            self.model.json_exporter.action_frame(
+                self.model,
+                self.unique_id,
+                "remove_smoke",
+                ap_before=ap_before,
+                ap_after=self.ap,
+                target=[cell_x, cell_y],
+                grid_changes=grid_changes
+            )
+            
+            self.model.log_action(
+                "Bombero %s eliminó humo en (%s, %s) | AP: -1 → %s restantes", "EXTINCIÓN", self.unique_id, cell_x, cell_y, self.ap
+            )
+            self._local_dirty = True
+            return True
+        
+        return False
+
+    # Indexed by the ExtinguishAction codes
+    _EXTINGUISH_HANDLERS = (_extinguish, _convert_to_smoke, _remove_smoke)
+    
+    # ExtinguishAction of each extinguishing action code, on the agent's cell or an adjacent one
+    _EXTINGUISH_TYPES = {
+        ACTION_EXTINGUISH: ExtinguishAction.FIRE,
+        ACTION_CONVERT: ExtinguishAction.CONVERT,
+        ACTION_REMOVE_SMOKE: ExtinguishAction.SMOKE,
+        ACTION_EXTINGUISH_ADJACENT: ExtinguishAction.FIRE,
+        ACTION_CONVERT_ADJACENT: ExtinguishAction.CONVERT,
+        ACTION_REMOVE_ADJACENT_SMOKE: ExtinguishAction.SMOKE,
+    }
+
     def open_close_door(self, direction):
         """Opens or closes an adjacent door in the specified direction (as a deliberate action, costs AP)"""
         if self.ap < 1:
@@ -1256,12 +1261,10 @@ class FirefighterAgent(Agent):
         if DirectionHelper.is_door(self.model, y, x, direction):
             door_pos = DirectionHelper.get_wall_key(y, x, direction)
             
-            if door_pos not in self.model.door_states:
-                self.model.door_states[door_pos] = "closed"
-            
-            current_state = self.model.door_states[door_pos]
-            new_state = "open" if current_state == "closed" else "closed"
-            self.model.door_states[door_pos] = new_state
+            # A destroyed door is treated as closed, so toggling it opens it
+            opening = self.model.door_state[door_pos] != DoorState.OPEN
+            self.model.set_door_state(y, x, direction, DoorState.OPEN if opening else DoorState.CLOSED)
+            new_state = "open" if opening else "closed"
             
             ap_before = self.ap
             self.ap -= 1  
@@ -1297,8 +1300,9 @@ class FirefighterAgent(Agent):
             
             dir_names = ["north", "east", "south", "west"]
             action_text = "opened" if new_state == "open" else "closed"
-            self.model.log_action(f"Firefighter {self.unique_id} {action_text} door to {dir_names[direction]} [-1 AP]")
+            self.model.log_action("Firefighter %s %s door to %s [-1 AP]", "INFO", self.unique_id, action_text, dir_names[direction])
             
+            self._local_dirty = True
             return True, door_pos, new_state
         else:
             return False, None, None
@@ -1311,20 +1315,17 @@ class FirefighterAgent(Agent):
         x, y = self.pos
         
         if DirectionHelper.has_wall(self.model, y, x, direction):
-            nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
+            ny = self.model.nbr_y.item(y, x, direction)
+            nx = self.model.nbr_x.item(y, x, direction)
             
-            is_perimeter = DirectionHelper.is_perimeter(self.model, nx, ny)
-            
-            if is_perimeter:
+            if ny < 0 or self.model.perimeter[ny, nx]:
                 return False
             
             ap_before = self.ap  
             wall_destroyed = DirectionHelper.damage_wall(self.model, y, x, direction)
             self.ap -= 2
             
-            wall_damage_changes = []
-            if hasattr(self.model, 'wall_damage_changes'):
-                wall_damage_changes = self.model.wall_damage_changes
+            wall_damage_changes = self.model.wall_damage_changes
             
             self.model.json_exporter.action_frame(
                 self.model,
@@ -1338,245 +1339,140 @@ class FirefighterAgent(Agent):
             
             dir_names = ["north", "east", "south", "west"]
             if wall_destroyed:
-                self.model.log_action(f"Firefighter {self.unique_id} destroyed wall to {dir_names[direction]} [-2 AP]")
+                self.model.log_action("Firefighter %s destroyed wall to %s [-2 AP]", "INFO", self.unique_id, dir_names[direction])
             else:
-                self.model.log_action(f"Firefighter {self.unique_id} damaged wall to {dir_names[direction]} [-2 AP]")
+                self.model.log_action("Firefighter %s damaged wall to %s [-2 AP]", "INFO", self.unique_id, dir_names[direction])
             
+            self._local_dirty = True
             return True
         else:
             return False
     
     def step(self):
+        model = self.model
+        
         # If we are in the board entry phase
-        if self.model.stage == 1 and self.assigned_entry is not None:
-            self.model.grid.move_agent(self, self.assigned_entry)
+        if model.stage == 1 and self.assigned_entry is not None:
+            model.move_firefighter(self, self.assigned_entry)
             self.assigned_entry = None
             return
         
+        self._local_dirty = True
+        grid_state = model.grid_state
+        actions = self._actions
+        adjacent = self._adjacent
+        
         # While there are action points, allow actions
         while self.ap > 0:
             x, y = self.pos
-            current_cell = self.model.grid_state[y, x]
             
             # Check for POI in current cell
-            if current_cell["poi"] is not None:
-                if current_cell["poi"] == "v" and not self.carrying:
-                    self.carrying = True
-                    current_cell["poi"] = None
-                elif current_cell["poi"] == "f":
-                    current_cell["poi"] = None
+            poi = grid_state.poi[y, x]
+            if poi == GridState.POI_VICTIM and not self.carrying:
+                self.carrying = True
+                grid_state.poi[y, x] = GridState.POI_NONE
+                model.remove_poi(y, x)
+            elif poi == GridState.POI_FALSE_ALARM:
+                grid_state.poi[y, x] = GridState.POI_NONE
+                model.remove_poi(y, x)
             
             # Check for rescue at entry with victim
             if self.carrying:
-                is_entry = self.pos in [(e[1], e[0]) for e in self.model.scenario["entries"]]
-                
-                if is_entry:
+                if self.pos in model.entries_xy:
                     self.carrying = False
-                    self.model.victims_rescued += 1
-                    GameMechanics.replenish_pois(self.model)
-                    self.model.log_action(f"Firefighter {self.unique_id} rescued a victim at ({self.pos[0]}, {self.pos[1]})!")
+                    model.victims_rescued += 1
+                    GameMechanics.replenish_pois(model)
+                    model.log_action("Firefighter %s rescued a victim at (%s, %s)!", "INFO", self.unique_id, self.pos[0], self.pos[1])
                     return
         
-            # Generate possible actions
-            possible_actions = []
-            possible_actions.append("move")
-            
-            # Get adjacent cells
-            adjacent_cells = []
-            for direction in range(4):
-                nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
-                if 0 <= ny < self.model.grid.height and 0 <= nx < self.model.grid.width:
-                    if DirectionHelper.can_pass_wall(self.model, y, x, direction):
-                        adjacent_cells.append((ny, nx))
-
-            # Check for fire actions
-            if current_cell["fire"] and self.ap >= 2:
-                possible_actions.append("extinguish_fire")
-                possible_actions.append("convert_fire_to_smoke")
-            
-            if current_cell["smoke"] and self.ap >= 1:
-                possible_actions.append("remove_smoke")
-            
-            for cell_y, cell_x in adjacent_cells:
-                if self.model.grid_state[cell_y, cell_x]["fire"] and self.ap >= 2:
-                    possible_actions.append("extinguish_adjacent_fire")
-                    possible_actions.append("convert_adjacent_fire_to_smoke")
-                if self.model.grid_state[cell_y, cell_x]["smoke"] and self.ap >= 1:
-                    possible_actions.append("remove_adjacent_smoke")
-            
-            # Check for door actions
-            walls = current_cell["walls"]
-            for i in range(4):
-                door_pos = None
-                if i == 0 and y > 0:
-                    door_pos = (y, x, 0)
-                elif i == 1 and x < self.model.grid.width - 1:
-                    door_pos = (y, x, 1)
-                elif i == 2 and y < self.model.grid.height - 1:
-                    door_pos = (y, x, 2)
-                elif i == 3 and x > 0:
-                    door_pos = (y, x, 3)
-                
-                if door_pos:
-                    door_positions = ScenarioParser.compute_door_positions(self.model.scenario["doors"])
-                    if door_pos in door_positions and self.ap >= 1:
-                        possible_actions.append(f"door_{i}")
-            
-            # Check for wall cutting actions
-            for i in range(4):
-                if walls[i] == 1 and self.ap >= 2:
-                    is_perimeter = False
-                    
-                    if i == 0 and y == 1:
-                        is_perimeter = True
-                    elif i == 1 and x == self.model.grid.width - 2:
-                        is_perimeter = True
-                    elif i == 2 and y == self.model.grid.height - 2:
-                        is_perimeter = True
-                    elif i == 3 and x == 1:
-                        is_perimeter = True
-                            
-                    if (y == 0 and i == 0) or \
-                    (x == self.model.grid.width - 1 and i == 1) or \
-                    (y == self.model.grid.height - 1 and i == 2) or \
-                    (x == 0 and i == 3):
-                        is_perimeter = True
-                        
-                    if not is_perimeter:
-                        possible_actions.append(f"cut_{i}")
-            
-            # Consider passing turn
-            is_ambulance = (x == 9 and y == 0)
-            
-            if (len(possible_actions) == 0) or (self.ap <= 4) or is_ambulance:
-                possible_actions.append("pass")
+            # Candidate actions only change after a successful action
+            if self._local_dirty:
+                self._local_dirty = False
+                n_actions, n_adjacent = candidate_actions(
+                    x, y, self.ap, x == 9 and y == 0, grid_state.fire, grid_state.smoke,
+                    model.cell_bits, model.nbr_y, model.nbr_x, model.perimeter_wall_mask,
+                    actions, adjacent
+                )
+                adjacent_cells = adjacent[:n_adjacent].tolist()
+                # Set when a move finds no legal destination; it cannot succeed until the board changes
+                moves_blocked = False
                 
             # Choose action randomly
-            action = self.model.random.choice(possible_actions)
+            action = int(actions[self._draw_index(n_actions)])
             
             # Execute chosen action
-            if action == "move":
-                self._perform_movement()
-            elif action == "extinguish_fire":
-                self.extinguish_fire(y, x, "fire")
-            elif action == "convert_fire_to_smoke":
-                self.extinguish_fire(y, x, "convert")
-            elif action == "remove_smoke":
-                self.extinguish_fire(y, x, "smoke")
-            elif action == "extinguish_adjacent_fire":
-                cells_with_fire = [(cy, cx) for cy, cx in adjacent_cells 
-                                 if self.model.grid_state[cy, cx]["fire"]]
-                if cells_with_fire:
-                    cy, cx = self.model.random.choice(cells_with_fire)
-                    self.extinguish_fire(cy, cx, "fire")
-            elif action == "convert_adjacent_fire_to_smoke":
-                cells_with_fire = [(cy, cx) for cy, cx in adjacent_cells 
-                                 if self.model.grid_state[cy, cx]["fire"]]
-                if cells_with_fire:
-                    cy, cx = self.model.random.choice(cells_with_fire)
-                    self.extinguish_fire(cy, cx, "convert")
-            elif action == "remove_adjacent_smoke":
-                cells_with_smoke = [(cy, cx) for cy, cx in adjacent_cells 
-                                  if self.model.grid_state[cy, cx]["smoke"]]
-                if cells_with_smoke:
-                    cy, cx = self.model.random.choice(cells_with_smoke)
-                    self.extinguish_fire(cy, cx, "smoke")
-            elif action.startswith("door_"):
-                direction = int(action.split("_")[1])
-                self.open_close_door(direction)
-            elif action.startswith("cut_"):
-                direction = int(action.split("_")[1])
-                self.cut_wall(direction)
-            elif action == "pass":
+            if action == ACTION_MOVE:
+                # A failed move leaves nothing to rebuild, but redrawing it still has to consume the draw
+                if not moves_blocked:
+                    moves_blocked = not self._perform_movement()
+            elif action <= ACTION_REMOVE_SMOKE:
+                self.extinguish_fire(y, x, self._EXTINGUISH_TYPES[action])
+            elif action <= ACTION_REMOVE_ADJACENT_SMOKE:
+                kind = self._EXTINGUISH_TYPES[action]
+                layer = grid_state.smoke if kind == ExtinguishAction.SMOKE else grid_state.fire
+                targets = [(cy, cx) for cy, cx in adjacent_cells if layer[cy, cx]]
+                if targets:
+                    cy, cx = targets[self._draw_index(len(targets))]
+                    self.extinguish_fire(cy, cx, kind)
+            elif action >= ACTION_CUT:
+                self.cut_wall(action - ACTION_CUT)
+            elif action >= ACTION_DOOR:
+                self.open_close_door(action - ACTION_DOOR)
+            else:
+                # ACTION_PASS
                 break
 
     def _perform_movement(self):
         """Helper method to perform a movement, respecting constraints"""
+        model = self.model
         x, y = self.pos
         original_pos = [x, y]
         ap_before = self.ap
         
-        movements = []
-        
-        for direction in range(4):
-            # Check if can pass through wall/door
-            can_pass = False
-            
-            # Case 1: No wall
-            if not DirectionHelper.has_wall(self.model, y, x, direction):
-                can_pass = True
-            # Case 2: Destroyed wall (2+ damage)
-            elif DirectionHelper.is_wall_destroyed(self.model, y, x, direction):
-                can_pass = True
-            # Case 3: Is a door AND it's open
-            elif DirectionHelper.is_door(self.model, y, x, direction):
-                is_open = DirectionHelper.is_door_open(self.model, y, x, direction)
-                if is_open:
-                    can_pass = True
-                else:
-                    can_pass = False
-            
-            if can_pass:
-                nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
-                
-                # Check if the adjacent position is within grid limits
-                if 0 <= ny < self.model.grid.height and 0 <= nx < self.model.grid.width:
-                    # Check if it's not a perimeter cell (except for an entry)
-                    is_entry = (nx, ny) in [(e[1], e[0]) for e in self.model.scenario["entries"]]
-                    is_perimeter = DirectionHelper.is_perimeter(self.model, nx, ny)
-                    
-                    if not is_perimeter or is_entry:
-                        dest_cell = self.model.grid_state[ny, nx]
-                        
-                        # Calculate AP cost
-                        ap_cost = 1
-                        if dest_cell["fire"]:
-                            ap_cost = 2
-                        if self.carrying:
-                            ap_cost = 2
-                        
-                        # Check if has enough AP
-                        if self.ap >= ap_cost:
-                            # Cannot carry victim into fire
-                            if not (self.carrying and dest_cell["fire"]):
-                                movements.append((nx, ny, ap_cost, direction))
+        fire = model.grid_state.fire
+        out = self._moves
+        n = valid_moves(x, y, self.carrying, self.ap, model.pass_mask, fire,
+                        model.perimeter, model.entry_mask, out)
         
-        if not movements:
+        if n == 0:
             # Simply return False 
             return False
         
-        # Select random movement
-        new_pos_info = self.model.random.choice(movements)
-        new_pos = (new_pos_info[0], new_pos_info[1])
-        ap_cost = new_pos_info[2]
-        direction = new_pos_info[3]
-
-        if DirectionHelper.is_door(self.model, y, x, direction):
-            if not DirectionHelper.is_door_open(self.model, y, x, direction):
-                self.model.log_action(
-                    f"BLOQUEO DE SEGURIDAD: Bombero {self.unique_id} intentó atravesar puerta CERRADA en ({x},{y}) dir={direction}",
-                    "MOVIMIENTO"
-                )
-                return False
+        # With a victim, follow the shortest path to an entry when its next step is a legal move
+        k = -1
+        if self.carrying:
+            path = model.path_to_entry(self.pos)
+            if path:
+                step_x, step_y = path[0]
+                for i in range(n):
+                    if out[i, 0] == step_x and out[i, 1] == step_y:
+                        k = i
+                        break
+        
+        # Otherwise select random movement
+        if k < 0:
+            k = model.random.randrange(n)
+        new_pos = (int(out[k, 0]), int(out[k, 1]))
+        ap_cost = int(out[k, 2])
         
         # Perform the movement
-        self.model.grid.move_agent(self, new_pos)
+        model.move_firefighter(self, new_pos)
         self.ap -= ap_cost
         
         movement_type = "normal"
-        if self.model.grid_state[new_pos[1], new_pos[0]]["fire"]:
+        if fire[new_pos[1], new_pos[0]]:
             movement_type = "through fire"
         elif self.carrying:
             movement_type = "carrying victim"
         
-        self.model.log_action(
-            f"Bombero {self.unique_id} se movió a ({new_pos[0]}, {new_pos[1]}) | Estado: {movement_type} | AP: -{ap_cost} → {self.ap} restantes", 
-            "MOVIMIENTO"
+        model.log_action(
+            "Bombero %d se movió a (%d, %d) | Estado: %s | AP: -%d → %d restantes", 
+            "MOVIMIENTO", self.unique_id, new_pos[0], new_pos[1], movement_type, ap_cost, self.ap
         )
             
         # ONLY generate JSON for successful movements
-        self.model.json_exporter.action_frame(
-            self.model,
+        model.json_exporter.action_frame(
+            model,
             self.unique_id,
             "move",
             ap_before=ap_before, 
@@ -1587,76 +1483,132 @@ class FirefighterAgent(Agent):
         
         # Handle rescue and POI logic...
         new_x, new_y = new_pos
-        new_cell = self.model.grid_state[new_y, new_x]
+        poi = model.grid_state.poi
         
-        # Handle POIs in the new cell
-        if new_cell["poi"] is not None:
-            poi_type = new_cell["poi"]
-            
-            if poi_type == "v" and not self.carrying:
+        # Handle POIs in the new cell: one read, and a victim is only picked up with free hands
+        poi_type = poi[new_y, new_x]
+        if poi_type != GridState.POI_NONE:
+            if poi_type == GridState.POI_VICTIM and not self.carrying:
                 self.carrying = True
-                new_cell["poi"] = None
-                self.model.log_action(
-                    f"Bombero {self.unique_id} encontró y recogió una VÍCTIMA en ({new_x}, {new_y})",
-                    "POI"
+                poi[new_y, new_x] = GridState.POI_NONE
+                model.log_action(
+                    "Bombero %s encontró y recogió una VÍCTIMA en (%s, %s)", "POI", self.unique_id, new_x, new_y
                 )
                 
-                self.model.log_action(f"Firefighter {self.unique_id} picked up victim at ({new_x}, {new_y})")
+                model.log_action("Firefighter %s picked up victim at (%s, %s)", "INFO", self.unique_id, new_x, new_y)
                 
                 # Remove POI from scenario
-                for i, poi in enumerate(self.model.scenario["pois"]):
-                    if poi[0] == new_y and poi[1] == new_x:
-                        self.model.scenario["pois"].pop(i)
-                        break
+                model.remove_poi(new_y, new_x)
             
-            elif poi_type == "f":
-                new_cell["poi"] = None
+            elif poi_type == GridState.POI_FALSE_ALARM:
+                poi[new_y, new_x] = GridState.POI_NONE
                 
-                self.model.log_action(
-                    f"Bombero {self.unique_id} descubrió FALSA ALARMA en ({new_x}, {new_y})",
-                    "POI"
+                model.log_action(
+                    "Bombero %s descubrió FALSA ALARMA en (%s, %s)", "POI", self.unique_id, new_x, new_y
                 )
                 
                 # Remove POI from scenario
-                for i, poi in enumerate(self.model.scenario["pois"]):
-                    if poi[0] == new_y and poi[1] == new_x:
-                        self.model.scenario["pois"].pop(i)
-                        break
+                model.remove_poi(new_y, new_x)
                 
-                GameMechanics.replenish_pois(self.model)
+                GameMechanics.replenish_pois(model)
         
-        # Handle rescue at entry
-        is_entry = new_pos in [(e[1], e[0]) for e in self.model.scenario["entries"]]
-        if self.carrying and is_entry:
+        # Handle rescue at entry. Any entry is an exit (path_to_entry heads for the nearest one),
+        # so this is a set lookup rather than a compare against assigned_entry
+        if self.carrying and new_pos in model.entries_xy:
             self.carrying = False
-            self.model.victims_rescued += 1
+            model.victims_rescued += 1
             
-            self.model.log_action(f"Firefighter {self.unique_id} RESCUED VICTIM at entry ({new_x}, {new_y})!")
+            model.log_action("Firefighter %s RESCUED VICTIM at entry (%s, %s)!", "INFO", self.unique_id, new_x, new_y)
             
-            GameMechanics.replenish_pois(self.model)
+            GameMechanics.replenish_pois(model)
 
+        self._local_dirty = True
         return True
 
 class FireRescueModel(Model):
     """Fire rescue simulation model"""
     
-    def __init__(self, scenario, visualize_frames=True):
-        super().__init__()
+    # (row, column) step out of the board through each edge, in create_agents tie-break order
+    BORDER_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    BORDER_NAMES = ("north", "south", "west", "east")
+    # Direction index (N=0, E=1, S=2, W=3) of the same edges
+    BORDER_DIRECTIONS = (0, 2, 3, 1)
+    
+    # Indices into self.counters
+    RESCUED, LOST, DAMAGE = 0, 1, 2
+    # Counter values that end the game: 7 rescued, 4 lost, 24 damage points
+    END_AT = (7, 4, 24)
+    
+    def __init__(self, scenario, visualize_frames=True, seed=None):
+        super().__init__(seed=seed)
+        if seed is not None:
+            # Mesa only seeds model.random; the firefighters' pre-sampled draws come from model.rng
+            self.rng = np.random.default_rng(seed)
         
         self.grid = MultiGrid(10, 8, False)
+        # Board size as plain ints for bounds checks
+        self.grid_w = self.grid.width
+        self.grid_h = self.grid.height
         self.schedule = RandomActivation(self)
         self.scenario = scenario
         self.grid_state = ScenarioParser.build_grid_state(scenario)
-        self.door_states = {}
-        
-        door_positions = ScenarioParser.compute_door_positions(scenario["doors"])
-        for door_pos in door_positions:
-            self.door_states[door_pos] = "closed"
-        
-        self.wall_damage = {}
-        self.victims_lost = 0
-        self.victims_rescued = 0
-        self.damage_counters = 0
+        self.cell_bits = self.grid_state.bits
+        # Cell sides without a wall, i.e. the sides fire spreads through; only damage_wall changes them
+        self.open_sides = (self.cell_bits[:, :, None] & (1 << np.arange(4, dtype=np.uint8))) == 0
+        self.perimeter = ScenarioParser.build_perimeter_mask(*self.grid_state.shape)
+        # Cells fire and smoke may spread into, kept so advance_fire does not negate perimeter every turn
+        self.interior = ~self.perimeter
+        self.perimeter_wall_mask = ScenarioParser.build_perimeter_wall_mask(*self.grid_state.shape)
+        self.nbr_y, self.nbr_x = ScenarioParser.build_neighbor_tables(*self.grid_state.shape)
+        # Entries as Mesa (x, y) positions for O(1) membership tests
+        self.entries_xy = frozenset((column, row) for row, column in scenario["entries"])
+        # Closest board edge of every entry (indexing BORDER_STEPS / BORDER_NAMES),
+        # and the entry sides facing those edges as (row, column, direction) for the board drawing
+        self.entry_borders = ScenarioParser.entry_borders(scenario["entries"], *self.grid_state.shape)
+        self.entry_sides = frozenset(
+            (row, column, self.BORDER_DIRECTIONS[border])
+            for (row, column), border in zip(scenario["entries"], self.entry_borders)
+        )
+        self.entry_mask = np.zeros(self.grid_state.shape, dtype=bool)
+        for row, column in scenario["entries"]:
+            self.entry_mask[row, column] = True
+        # Canonical door sides, computed once: the ordered tuple for iteration, the set for lookups
+        self.door_positions = tuple(ScenarioParser.compute_door_positions(scenario["doors"]))
+        self.door_position_set = frozenset(self.door_positions)
+        # (row, column) -> first scenario door with an end on that cell, for the JSON door changes
+        self.door_at_cell = {}
+        for door in scenario["doors"]:
+            for end in door:
+                self.door_at_cell.setdefault(end, door)
+        self.door_mask = np.zeros(self.grid_state.shape + (4,), dtype=bool)
+        for door_pos in self.door_positions:
+            self.door_mask[door_pos] = True
+        
+        # DoorState value per (row, column, direction) cell side, mirrored on both sides of each door
+        self.door_state = np.zeros(self.grid_state.shape + (4,), dtype=np.int8)
+        
+        for y, x, direction in self.door_positions:
+            self.door_state[y, x, direction] = DoorState.CLOSED
+            ny, nx = self.nbr_y[y, x, direction], self.nbr_x[y, x, direction]
+            if ny >= 0:
+                self.door_state[ny, nx, DirectionHelper.get_opposite_direction(direction)] = DoorState.CLOSED
+        
+        # Which cell sides a firefighter can cross, refreshed on every wall or door change
+        self.pass_mask = np.zeros(self.grid_state.shape + (4,), dtype=bool)
+        self.build_pass_mask()
+        
+        
+        # Damage points per (row, column, direction) wall side
+        self.wall_damage = np.zeros(self.grid_state.shape + (4,), dtype=np.uint8)
+        # Scratch rows the explosion kernels report their side effects in
+        self.blast_events = np.zeros((MAX_EVENTS, 5), dtype=np.int32)
+        # Cells the spread_fire kernel reaches each turn: smoke that flashes over, and empty cells
+        self.spread_flashover = np.zeros(self.grid_state.shape, dtype=bool)
+        self.spread_smoke = np.zeros(self.grid_state.shape, dtype=bool)
+        # Game counters, indexed by RESCUED/LOST/DAMAGE and exposed through the properties below
+        self.counters = np.zeros(3, dtype=np.int32)
+        # Set by _set_counter as soon as a counter reaches its END_AT value
+        self.end_reached = False
         self.simulation_over = False
 
         self.visualize_frames = visualize_frames
@@ -1665,17 +1617,143 @@ class FireRescueModel(Model):
         # Logs of actions
         self.turn_actions = []
         
+        # Per-turn change lists for the JSON frames, reset at the start of every step
+        self.grid_changes = []
+        self.door_changes = []
+        self.wall_damage_changes = []
+        self.poi_changes = []
+        
+        # Mesa (x, y) position -> firefighters standing there, kept by create_agents and move_firefighter
+        self.firefighters_by_cell = {}
+        
         self.create_agents()
         self.step_count = 0
         self.stage = 0
-        self.mazo_pois = []
+        # POI deck, filled and shuffled by GameMechanics.replenish_pois the first time it is drawn from
+        self.mazo_pois = deque()
         self.json_exporter = JSONExporter()
 
-    def log_action(self, message, category="INFO"):
-        """Registers an action message for the current turn with category"""
-        timestamp = f"[T{self.step_count}]"
-        categorized_message = f"{timestamp} [{category}] {message}"
-        self.turn_actions.append(categorized_message)
+    def build_pass_mask(self):
+        """Computes pass_mask for every cell side from the walls and the door states"""
+        self._path_cache = {}
+        rows, columns = self.grid_state.shape
+        for y in range(rows):
+            for x in range(columns):
+                for direction in range(4):
+                    self._refresh_side(y, x, direction)
+
+    def refresh_passage(self, y, x, direction):
+        """Updates pass_mask on both sides of a wall or door after it changes"""
+        self._path_cache.clear()
+        self._refresh_side(y, x, direction)
+        
+        ny, nx = self.nbr_y[y, x, direction], self.nbr_x[y, x, direction]
+        if ny >= 0:
+            self._refresh_side(ny, nx, DirectionHelper.get_opposite_direction(direction))
+
+    def _refresh_side(self, y, x, direction):
+        # A door side is only crossable while the door is open; any other side while it has no wall
+        if DirectionHelper.is_door(self, y, x, direction):
+            self.pass_mask[y, x, direction] = DirectionHelper.is_door_open(self, y, x, direction)
+        else:
+            self.pass_mask[y, x, direction] = not DirectionHelper.has_wall(self, y, x, direction)
+
+    def path_to_entry(self, start):
+        """Returns the shortest path from start to the nearest entry as Mesa positions, cached until a wall or door changes"""
+        path = self._path_cache.get(start)
+        if path is None:
+            path = self._path_cache[start] = self._find_path_to_entry(start)
+        return path
+
+    def _find_path_to_entry(self, start):
+        # Breadth-first search over pass_mask; moves are 4-way with unit cost, so BFS is optimal
+        parents = {start: None}
+        queue = deque([start])
+        
+        while queue:
+            x, y = current = queue.popleft()
+            
+            if current != start and current in self.entries_xy:
+                path = []
+                while current != start:
+                    path.append(current)
+                    current = parents[current]
+                path.reverse()
+                return path
+            
+            passable = self.pass_mask[y, x].tolist()
+            nbr_y = self.nbr_y[y, x].tolist()
+            nbr_x = self.nbr_x[y, x].tolist()
+            for direction in range(4):
+                ny, nx = nbr_y[direction], nbr_x[direction]
+                if not passable[direction] or ny < 0 or (nx, ny) in parents:
+                    continue
+                if self.perimeter[ny, nx] and not self.entry_mask[ny, nx]:
+                    continue
+                parents[(nx, ny)] = current
+                queue.append((nx, ny))
+        
+        return []
+
+    @property
+    def victims_rescued(self):
+        return self.counters.item(self.RESCUED)
+    
+    @victims_rescued.setter
+    def victims_rescued(self, value):
+        self._set_counter(self.RESCUED, value)
+    
+    @property
+    def victims_lost(self):
+        return self.counters.item(self.LOST)
+    
+    @victims_lost.setter
+    def victims_lost(self, value):
+        self._set_counter(self.LOST, value)
+    
+    @property
+    def damage_counters(self):
+        return self.counters.item(self.DAMAGE)
+    
+    @damage_counters.setter
+    def damage_counters(self, value):
+        self._set_counter(self.DAMAGE, value)
+
+    def _set_counter(self, index, value):
+        """Writes a game counter and flags the end of the game when it reaches its threshold"""
+        self.counters[index] = value
+        if value >= self.END_AT[index]:
+            self.end_reached = True
+
+    def set_door_state(self, y, x, direction, state):
+        """Sets a door to a DoorState value on both of its sides and updates pass_mask around it"""
+        self.door_state[y, x, direction] = state
+        ny, nx = self.nbr_y[y, x, direction], self.nbr_x[y, x, direction]
+        if ny >= 0:
+            self.door_state[ny, nx, DirectionHelper.get_opposite_direction(direction)] = state
+        self.refresh_passage(y, x, direction)
+
+    def add_poi(self, y, x, poi_type):
+        """Adds a POI to the scenario's (row, column) -> type map"""
+        self.scenario["pois"][(y, x)] = poi_type
+
+    def remove_poi(self, y, x):
+        """Removes the POI at (y, x) and returns its type, or None when there was none"""
+        return self.scenario["pois"].pop((y, x), None)
+
+    def log_action(self, message, category="INFO", *args):
+        """Registers an action message for the current turn with category, %-formatted with args when read"""
+        # Stored as (turn, category, message, args); the text is only assembled when someone reads the log
+        self.turn_actions.append((self.step_count, category, message, args))
+
+    def iter_actions(self):
+        """Yields (turn, category, text) for every action logged this turn"""
+        for turn, category, message, args in self.turn_actions:
+            yield turn, category, (message % args if args else message)
+
+    def format_actions(self):
+        """Returns this turn's action log as "[T<turn>] [<category>] <message>" lines"""
+        return [f"[T{turn}] [{category}] {text}" for turn, category, text in self.iter_actions()]
 
     def visualize_current_frame(self, title=None):
         """Visualiza el estado actual como un frame individual"""
@@ -1694,12 +1772,9 @@ class FireRescueModel(Model):
         """Returns a formatted version of action logs for display"""
         categories = {"MOVIMIENTO": [], "EXTINCIÓN": [], "FUEGO": [], "KNOCKDOWN": [], "POI": [], "INFO": []}
         
-        for action in self.turn_actions:
-            for category in categories.keys():
-                if f"[{category}]" in action:
-                    clean_action = action.replace(f"[{category}] ", "")
-                    categories[category].append(clean_action)
-                    break
+        for turn, category, text in self.iter_actions():
+            if category in categories:
+                categories[category].append(f"[T{turn}] {text}")
         
         formatted_logs = []
         for category, logs in categories.items():
@@ -1712,76 +1787,72 @@ class FireRescueModel(Model):
 
     def print_turn_summary(self):
         """Prints a detailed summary of the actions for the current turn"""
-        print(f"\n{'=' * 60}")
-        print(f"     RESUMEN DEL TURNO {self.step_count}     ")
-        print(f"{'=' * 60}")
-        print(f"• Víctimas rescatadas: {self.victims_rescued}")
-        print(f"• Víctimas perdidas: {self.victims_lost}")
-        print(f"• Daño estructural: {self.damage_counters}/24")
-        print(f"• POIs activos: {len(self.scenario['pois'])}")
-        print(f"• Focos de fuego activos: {len(self.scenario['fires'])}")
-        print(f"• POIs restantes en mazo: {len(self.mazo_pois)}")
-        
-        print("\nPOSICIÓN DE BOMBEROS:")
+        lines = []
+        lines.append(f"\n{'=' * 60}")
+        lines.append(f"     RESUMEN DEL TURNO {self.step_count}     ")
+        lines.append(f"{'=' * 60}")
+        lines.append(f"• Víctimas rescatadas: {self.victims_rescued}")
+        lines.append(f"• Víctimas perdidas: {self.victims_lost}")
+        lines.append(f"• Daño estructural: {self.damage_counters}/24")
+        lines.append(f"• POIs activos: {len(self.scenario['pois'])}")
+        lines.append(f"• Focos de fuego activos: {len(self.scenario['fires'])}")
+        lines.append(f"• POIs restantes en mazo: {len(self.mazo_pois)}")
+        
+        lines.append("\nPOSICIÓN DE BOMBEROS:")
         for agent in self.schedule.agents:
             status = "Con víctima" if agent.carrying else "Sin víctima"
             x, y = agent.pos
-            is_fire = self.grid_state[y, x]["fire"]
-            is_smoke = self.grid_state[y, x]["smoke"]
+            is_fire = self.grid_state.fire[y, x]
+            is_smoke = self.grid_state.smoke[y, x]
             cell_state = "en FUEGO" if is_fire else ("en HUMO" if is_smoke else "normal")
-            print(f"  Bombero {agent.unique_id}: ({x}, {y}) | AP: {agent.ap}/{agent.max_ap} | {status} | Casilla: {cell_state}")
+            lines.append(f"  Bombero {agent.unique_id}: ({x}, {y}) | AP: {agent.ap}/{agent.max_ap} | {status} | Casilla: {cell_state}")
         
         if self.turn_actions:
-            print("\nACCIONES DE ESTE TURNO:")
+            lines.append("\nACCIONES DE ESTE TURNO:")
             categories = {"MOVIMIENTO": [], "EXTINCIÓN": [], "FUEGO": [], "KNOCKDOWN": [], "POI": [], "INFO": []}
             
-            for action in self.turn_actions:
-                for category in categories.keys():
-                    if f"[{category}]" in action:
-                        categories[category].append(action)
-                        break
+            for turn, category, text in self.iter_actions():
+                if category in categories:
+                    categories[category].append(f"[T{turn}] {text}")
 
             for category, logs in categories.items():
                 if logs:
-                    print(f"\n--- {category} ---")
-                    for log in logs:
-                        log = log.replace(f"[{category}] ", "")
-                        print(f"  • {log}")
+                    lines.append(f"\n--- {category} ---")
+                    lines += [f"  • {log}" for log in logs]
         
         if self.simulation_over:
-            print("\n" + "*" * 60)
-            print("*** SIMULACIÓN FINALIZADA ***")
+            lines.append("\n" + "*" * 60)
+            lines.append("*** SIMULACIÓN FINALIZADA ***")
             if self.victims_rescued >= 7:
-                print(f"¡VICTORIA! Se han rescatado {self.victims_rescued} víctimas.")
+                lines.append(f"¡VICTORIA! Se han rescatado {self.victims_rescued} víctimas.")
             elif self.victims_lost >= 4:
-                print(f"DERROTA: Se han perdido {self.victims_lost} víctimas.")
+                lines.append(f"DERROTA: Se han perdido {self.victims_lost} víctimas.")
             else:
-                print(f"DERROTA: El edificio ha colapsado ({self.damage_counters} puntos de daño).")
-            print("*" * 60)
-        print("=" * 60)
+                lines.append(f"DERROTA: El edificio ha colapsado ({self.damage_counters} puntos de daño).")
+            lines.append("*" * 60)
+        lines.append("=" * 60)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def initialize_door_states(self):
         """Inicializa todas las puertas como cerradas al inicio, considerando ambos lados"""
-        self.door_states = {}
+        self.door_state[:] = DoorState.ABSENT
         
-        door_positions = ScenarioParser.compute_door_positions(self.scenario["doors"])
+        door_positions = self.door_positions
         
         for door_pos in door_positions:
-            self.door_states[door_pos] = "closed"
+            self.door_state[door_pos] = DoorState.CLOSED
             
-        door_states_copy = dict(self.door_states)
-        for pos, state in door_states_copy.items():
-            y, x, direction = pos
-            nx, ny = DirectionHelper.get_adjacent_position(x, y, direction)
+        for y, x, direction in door_positions:
+            ny, nx = self.nbr_y[y, x, direction], self.nbr_x[y, x, direction]
             
-            if 0 <= ny < self.grid.height and 0 <= nx < self.grid.width:
+            if ny >= 0:
                 
                 opposite_direction = DirectionHelper.get_opposite_direction(direction)
-                opposite_door_pos = DirectionHelper.get_wall_key(ny, nx, opposite_direction)
-                
-                self.door_states[opposite_door_pos] = state
+                self.door_state[ny, nx, opposite_direction] = self.door_state[y, x, direction]
+        
+        self.build_pass_mask()
         
-        self.log_action(f"Sistema de puertas inicializado: {len(self.door_states)} posiciones (incluyendo direcciones bidireccionales)")
+        self.log_action("Sistema de puertas inicializado: %s posiciones (incluyendo direcciones bidireccionales)", "INFO", np.count_nonzero(self.door_state))
         
         for (r1, c1), (r2, c2) in self.scenario["doors"]:
             door_found = False
@@ -1792,48 +1863,43 @@ class FireRescueModel(Model):
                     break
             
             if not door_found:
-                self.log_action(f"ADVERTENCIA: Puerta ({r1},{c1})-({r2},{c2}) no tiene posición computada.")
+                self.log_action("ADVERTENCIA: Puerta (%s,%s)-(%s,%s) no tiene posición computada.", "INFO", r1, c1, r2, c2)
 
     def create_agents(self):
         """Create 6 firefighter agents distributed among available entries"""
         num_firefighters = 6
         num_entries = len(self.scenario["entries"])
+        # Activation order, owned by the model so step() does not go through the scheduler
+        self.firefighters = []
+        # Per-firefighter state behind the FirefighterAgent ap/max_ap/carrying properties
+        self._ap = np.zeros(num_firefighters, dtype=np.int8)
+        self._max_ap = np.zeros(num_firefighters, dtype=np.int8)
+        self._carrying = np.zeros(num_firefighters, dtype=bool)
         
         for i in range(num_firefighters):
             entry_idx = i % num_entries
             pos = self.scenario["entries"][entry_idx]
             row, column = pos
             
-            rows, columns = self.grid_state.shape
-            north_dist = row
-            south_dist = rows - 1 - row
-            west_dist = column
-            east_dist = columns - 1 - column
-            
-            if north_dist <= min(south_dist, west_dist, east_dist):
-                ext_row, ext_col = row - 1, column
-                direction = "north"
-            elif south_dist <= min(north_dist, west_dist, east_dist):
-                ext_row, ext_col = row + 1, column
-                direction = "south"
-            elif west_dist <= min(north_dist, south_dist, east_dist):
-                ext_row, ext_col = row, column - 1
-                direction = "west"
-            else:
-                ext_row, ext_col = row, column + 1
-                direction = "east"
+            side = self.entry_borders[entry_idx]
+            d_row, d_col = self.BORDER_STEPS[side]
+            ext_row, ext_col = row + d_row, column + d_col
+            direction = self.BORDER_NAMES[side]
             
             mesa_ext_pos = (ext_col, ext_row)
             agent = FirefighterAgent(i, self, mesa_ext_pos)
             agent.assigned_entry = (column, row)
             agent.direction = direction
             
-            try:
-                self.grid.place_agent(agent, mesa_ext_pos)
-            except Exception as e:
-                self.grid.place_agent(agent, (column, row))
+            # Positions are kept on the agents and in firefighters_by_cell; see move_firefighter
+            if self.grid.out_of_bounds(mesa_ext_pos):
+                agent.pos = (column, row)
+            else:
+                agent.pos = mesa_ext_pos
+            self.firefighters_by_cell.setdefault(agent.pos, []).append(agent)
                 
             self.schedule.add(agent)
+            self.firefighters.append(agent)
     
     def step(self):
         """Advance simulation one step"""
@@ -1851,26 +1917,26 @@ class FireRescueModel(Model):
             self.log_action("Initial simulation state (Turn 0)")
                 
         self.step_count += 1
-        self.log_action(f"Starting turn {self.step_count}")
+        self.log_action("Starting turn %d", "INFO", self.step_count)
 
         if self.stage == 0 and self.step_count == 1:
             self.stage = 1
             self.log_action("Firefighters enter the building (End of Turn 1 setup)")
         
-        self.schedule.step() 
+        self._step_all_firefighters()
 
         if self.step_count > 1 or (self.step_count == 1 and self.stage == 1):
             self.log_action("Advancing fire propagation")
             GameMechanics.advance_fire(self)
             GameMechanics.check_firefighters_in_fire(self)
             
-            # Regenerate action points for the next turn
-            for agent in self.schedule.agents:
-                if hasattr(agent, 'ap') and hasattr(agent, 'max_ap'):
-                    ap_gained = min(4, agent.max_ap - agent.ap)
-                    agent.ap = min(agent.ap + 4, agent.max_ap)
-                    if ap_gained > 0:
-                        self.log_action(f"Firefighter {agent.unique_id} recovers {ap_gained} action points (Total: {agent.ap})")
+            # Regenerate action points for the next turn, for all firefighters at once
+            ap_before = self._ap.copy()
+            np.minimum(self._ap + 4, self._max_ap, out=self._ap)
+            for agent in self.firefighters:
+                ap_gained = agent.ap - ap_before.item(agent.unique_id)
+                if ap_gained > 0:
+                    self.log_action("Firefighter %d recovers %d action points (Total: %d)", "INFO", agent.unique_id, ap_gained, agent.ap)
 
             GameMechanics.replenish_pois(self)
 
@@ -1894,58 +1960,82 @@ class FireRescueModel(Model):
             if self.victims_rescued >= 7:
                 result = "victory"
                 message = f"All {self.victims_rescued} victims rescued! Congratulations!"
-                self.log_action(f"VICTORY! {self.victims_rescued} victims rescued")
+                self.log_action("VICTORY! %s victims rescued", "INFO", self.victims_rescued)
             elif self.victims_lost >= 4:
                 result = "defeat_victims"
                 message = f"{self.victims_lost} victims were lost in the fire."
-                self.log_action(f"DEFEAT: {self.victims_lost} victims lost in the fire")
+                self.log_action("DEFEAT: %s victims lost in the fire", "INFO", self.victims_lost)
             else:
                 result = "defeat_collapse"
                 message = f"Building collapsed with {self.damage_counters} damage points."
-                self.log_action(f"DEFEAT: Building collapsed with {self.damage_counters} damage points")
+                self.log_action("DEFEAT: Building collapsed with %s damage points", "INFO", self.damage_counters)
         
-        print("\n=== ACCIONES DEL TURNO", self.step_count, "===")
-        for idx, action in enumerate(self.turn_actions, 1):
-            print(f"{idx}. {action}")
-        print("=" * 40)
+        if logger.isEnabledFor(logging.DEBUG):
+            lines = [f"\n=== ACCIONES DEL TURNO {self.step_count} ==="]
+            lines += [f"{idx}. {action}" for idx, action in enumerate(self.format_actions(), 1)]
+            lines.append("=" * 40)
+            logger.debug("\n".join(lines))
 
         if self.visualize_frames:
             self.visualize_current_frame(f"Estado después del turno {self.step_count}")
             
 
+    def move_firefighter(self, agent, pos):
+        """Moves a firefighter by updating its position and firefighters_by_cell, without MultiGrid bookkeeping"""
+        by_cell = self.firefighters_by_cell
+        occupants = by_cell[agent.pos]
+        occupants.remove(agent)
+        if not occupants:
+            del by_cell[agent.pos]
+        
+        agent.pos = pos
+        by_cell.setdefault(pos, []).append(agent)
+
+    def snapshot_positions_for_viz(self):
+        """Returns a {(x, y): [firefighters]} occupancy map of the current positions"""
+        return {pos: list(agents) for pos, agents in self.firefighters_by_cell.items()}
+
+    def _step_all_firefighters(self):
+        """Runs every firefighter's turn in random order, like RandomActivation but without its weakref bookkeeping"""
+        # Each turn changes the board the next firefighter sees, so the turns stay sequential.
+        # Shuffling the persistent list in place draws from self.random exactly like the scheduler did
+        self.random.shuffle(self.firefighters)
+        for agent in self.firefighters:
+            agent.step()
+        
+        self.schedule.steps += 1
+        self.schedule.time += 1
+
     def _copy_grid_state(self):
         """Creates a copy of the grid state to compare changes"""
-        import copy
-        return copy.deepcopy(self.grid_state)
+        return self.grid_state.copy()
     
     def _calculate_grid_changes(self, grid_before):
         """Calculates changes in the grid between two states"""
         grid_changes = []
+        after = self.grid_state
         
-        for y in range(self.grid_state.shape[0]):
-            for x in range(self.grid_state.shape[1]):
-                before = grid_before[y, x]
-                after = self.grid_state[y, x]
-                
-                if (before["fire"] != after["fire"] or
-                    before["smoke"] != after["smoke"] or
-                    before["poi"] != after["poi"]):
-                    
-                    change = {
-                        "x": x,
-                        "y": y
-                    }
-                    
-                    if before["fire"] != after["fire"]:
-                        change["fire"] = after["fire"]
-                    
-                    if before["smoke"] != after["smoke"]:
-                        change["smoke"] = after["smoke"]
-                    
-                    if before["poi"] != after["poi"]:
-                        change["poi"] = after["poi"]
-                    
-                    grid_changes.append(change)
+        fire_changed = grid_before.fire != after.fire
+        smoke_changed = grid_before.smoke != after.smoke
+        poi_changed = grid_before.poi != after.poi
+        
+        ys, xs = np.nonzero(fire_changed | smoke_changed | poi_changed)
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            change = {
+                "x": x,
+                "y": y
+            }
+            
+            if fire_changed[y, x]:
+                change["fire"] = bool(after.fire[y, x])
+            
+            if smoke_changed[y, x]:
+                change["smoke"] = bool(after.smoke[y, x])
+            
+            if poi_changed[y, x]:
+                change["poi"] = GridState.POI_TYPES[after.poi[y, x]]
+            
+            grid_changes.append(change)
         
         return grid_changes
 
@@ -1953,10 +2043,14 @@ class Visualization:
     """Class that encapsulates all visualization functionalities"""
     
     @staticmethod
-    def visualize_grid_with_perimeter_and_doors(grid, door_positions, entries, fires=None, pois=None, model=None, title=None):
-        """Visualizes the game board with all its elements"""
+    def visualize_grid_with_perimeter_and_doors(grid, door_positions, entries, fires=None, pois=None, model=None, title=None, ax=None):
+        """Visualizes the game board with all its elements, redrawing into ax when given instead of opening a new figure"""
         rows, columns = grid.shape[:2]
-        fig, ax = plt.subplots(figsize=(12, 10))
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(12, 10))
+        else:
+            fig = ax.figure
+            ax.clear()
         ax.set_facecolor('#d9f2d9')
 
         if title:
@@ -1966,194 +2060,108 @@ class Visualization:
         else:
             ax.set_title("6×8 Scenario Map with Perimeter (8×10), Walls and Doors")
 
-        # Determine entry directions
-        entry_positions = []
-        for y, x in entries:
-            north_dist = y
-            south_dist = rows - 1 - y
-            west_dist = x
-            east_dist = columns - 1 - x
-            
-            min_dist = min(north_dist, south_dist, west_dist, east_dist)
-            
-            if min_dist == north_dist:
-                entry_positions.append((y, x, 0))  # North
-            elif min_dist == east_dist:
-                entry_positions.append((y, x, 1))  # East
-            elif min_dist == south_dist:
-                entry_positions.append((y, x, 2))  # South
-            else:
-                entry_positions.append((y, x, 3))  # West
+        # Sets for the per-side membership tests below; entry sides face the closest board edge
+        door_set = frozenset(door_positions)
+        if model is not None:
+            entry_set = model.entry_sides
+        else:
+            entry_set = frozenset(
+                (y, x, FireRescueModel.BORDER_DIRECTIONS[border])
+                for (y, x), border in zip(entries, ScenarioParser.entry_borders(entries, rows, columns))
+            )
 
+        perimeter = model.perimeter if model is not None else ScenarioParser.build_perimeter_mask(rows, columns)
+        # (row, column) -> POI type
+        poi_at = pois or {}
+
+        fire_mask = np.zeros((rows, columns), dtype=bool)
+        if fires:
+            fire_ys, fire_xs = zip(*fires)
+            fire_mask[fire_ys, fire_xs] = True
+        smoke_mask = model.grid_state.smoke & ~fire_mask if model is not None else np.zeros_like(fire_mask)
+
+        # Cell backgrounds as one image, row 0 at the top
+        background = np.select(
+            [fire_mask[:, :, None], smoke_mask[:, :, None], perimeter[:, :, None]],
+            [to_rgb('#ffcccc'), to_rgb('#e6e6e6'), to_rgb('#b3e6b3')],  # Fire, smoke, perimeter
+            default=to_rgb('#e6f7ff')  # Playable cells
+        )
+        ax.imshow(background, origin='upper', extent=(0, columns, 0, rows), interpolation='nearest', zorder=0)
+
+        # Grid lines as one collection
+        grid_segments = [[(x, 0), (x, rows)] for x in range(columns + 1)]
+        grid_segments += [[(0, y), (columns, y)] for y in range(rows + 1)]
+        ax.add_collection(LineCollection(grid_segments, colors='gray', linewidths=0.3))
+
+        # Fire, smoke and POI symbols, one scatter per marker style
+        fire_ys, fire_xs = np.nonzero(fire_mask)
+        Visualization._scatter(ax, fire_xs, fire_ys, rows, 'o', 15, '#ff6600', 'red', alpha=0.7)
+        Visualization._scatter(ax, fire_xs, fire_ys, rows, '*', 10, 'yellow', 'yellow')
+        smoke_ys, smoke_xs = np.nonzero(smoke_mask)
+        Visualization._scatter(ax, smoke_xs, smoke_ys, rows, 's', 14, '#a6a6a6', '#808080', alpha=0.6)
+        Visualization._scatter(ax, smoke_xs, smoke_ys, rows, 'o', 8, '#d3d3d3', '#d3d3d3', alpha=0.8)
+        for poi_type, marker, face in (('v', 'D', '#00cc66'), ('f', 'X', '#cccccc')):
+            cells = [pos for pos, t in poi_at.items() if t == poi_type]
+            if cells:
+                ys, xs = zip(*cells)
+                Visualization._scatter(ax, xs, ys, rows, marker, 12, face, 'black', zorder=10)
+
+        # Walls, doors and entries as one collection, gathered as (segment, color, width)
+        lines = []
         for y in range(rows):
             for x in range(columns):
-                # Check cell state
-                is_fire = (y, x) in fires if fires else False
-                is_smoke = False
+                top, bottom = rows - y, rows - y - 1
                 
-                if model is not None:
-                    is_smoke = model.grid_state[y, x]["smoke"]
-                
-                # Set background color
-                if is_fire:
-                    color = '#ffcccc'  # Fire
-                elif is_smoke:
-                    color = '#e6e6e6'  # Smoke
-                elif x == 0 or x == columns-1 or y == 0 or y == rows-1:
-                    color = '#b3e6b3'  # Perimeter
-                else:
-                    color = '#e6f7ff'  # Playable cells
-                    
-                rect = patches.Rectangle((x, rows - y - 1), 1, 1, linewidth=0, facecolor=color)
-                ax.add_patch(rect)
-
-                # Draw grid lines
-                ax.plot([x, x+1], [rows - y - 1, rows - y - 1], color='gray', linewidth=0.3)
-                ax.plot([x, x+1], [rows - y, rows - y], color='gray', linewidth=0.3)
-                ax.plot([x, x], [rows - y - 1, rows - y], color='gray', linewidth=0.3)
-                ax.plot([x+1, x+1], [rows - y - 1, rows - y], color='gray', linewidth=0.3)
-
-                # Draw fire symbol
-                if is_fire:
-                    ax.plot(x + 0.5, rows - y - 0.5, 'o', markersize=15, 
-                            markerfacecolor='#ff6600', markeredgecolor='red', alpha=0.7)
-                    ax.plot(x + 0.5, rows - y - 0.5, '*', markersize=10, 
-                            markerfacecolor='yellow', markeredgecolor='yellow')
-                
-                # Draw smoke symbol
-                elif is_smoke:
-                    ax.plot(x + 0.5, rows - y - 0.5, 's', markersize=14, 
-                            markerfacecolor='#a6a6a6', markeredgecolor='#808080', alpha=0.6)
-                    ax.plot(x + 0.5, rows - y - 0.5, 'o', markersize=8, 
-                            markerfacecolor='#d3d3d3', markeredgecolor='#d3d3d3', alpha=0.8)
-
-                # Draw POIs
-                if pois:
-                    for poi_y, poi_x, poi_type in pois:
-                        if poi_y == y and poi_x == x:
-                            if poi_type == 'v':  # Victim
-                                ax.plot(x + 0.5, rows - y - 0.5, 'D', markersize=12, 
-                                        markerfacecolor='#00cc66', markeredgecolor='black', zorder=10)
-                            elif poi_type == 'f':  # False alarm
-                                ax.plot(x + 0.5, rows - y - 0.5, 'X', markersize=12, 
-                                        markerfacecolor='#cccccc', markeredgecolor='black', zorder=10)
-                                
                 # Handle perimeter walls
-                is_perimeter = (x == 0 or x == columns-1 or y == 0 or y == rows-1)
-                if is_perimeter:
+                if perimeter[y, x]:
                     if y == 0:
-                        ax.plot([x, x+1], [rows - y, rows - y], color='black', linewidth=2.5)
+                        lines.append(([(x, top), (x+1, top)], 'black', 2.5))
                     if y == rows-1:
-                        ax.plot([x, x+1], [rows - y - 1, rows - y - 1], color='black', linewidth=2.5)
+                        lines.append(([(x, bottom), (x+1, bottom)], 'black', 2.5))
                     if x == 0:
-                        ax.plot([x, x], [rows - y - 1, rows - y], color='black', linewidth=2.5)
+                        lines.append(([(x, bottom), (x, top)], 'black', 2.5))
                     if x == columns-1:
-                        ax.plot([x+1, x+1], [rows - y - 1, rows - y], color='black', linewidth=2.5)
+                        lines.append(([(x+1, bottom), (x+1, top)], 'black', 2.5))
+                    continue
+                
+                # Get wall data
+                if model is not None:
+                    walls = [int(model.cell_bits[y, x]) >> d & 1 for d in range(4)]
                 else:
-                    # Get wall data
-                    if model is not None:
-                        wall_n, wall_e, wall_s, wall_w = model.grid_state[y, x]["walls"]
-                    else:
-                        wall_n, wall_e, wall_s, wall_w = grid[y, x]
-
-                    # Check for doors and entries
-                    door_n = (y, x, 0) in door_positions
-                    door_e = (y, x, 1) in door_positions
-                    door_s = (y, x, 2) in door_positions
-                    door_w = (y, x, 3) in door_positions
-                    
-                    entry_n = (y, x, 0) in entry_positions
-                    entry_e = (y, x, 1) in entry_positions
-                    entry_s = (y, x, 2) in entry_positions
-                    entry_w = (y, x, 3) in entry_positions
-
-                    # North direction
-                    if entry_n:
-                        ax.plot([x+0.25, x+0.75], [rows - y, rows - y], color='white', linewidth=4.0)
-                    elif door_n:
+                    walls = grid[y, x]
+
+                # Full side and the middle half used by doors and entries, per direction (N, E, S, W)
+                sides = (
+                    ([(x, top), (x+1, top)], [(x+0.25, top), (x+0.75, top)]),
+                    ([(x+1, bottom), (x+1, top)], [(x+1, bottom+0.25), (x+1, top-0.25)]),
+                    ([(x, bottom), (x+1, bottom)], [(x+0.25, bottom), (x+0.75, bottom)]),
+                    ([(x, bottom), (x, top)], [(x, bottom+0.25), (x, top-0.25)]),
+                )
+                
+                for direction, (full, half) in enumerate(sides):
+                    if (y, x, direction) in entry_set:
+                        lines.append((half, 'white', 4.0))
+                    elif (y, x, direction) in door_set:
                         door_color = 'brown'
-                        if model is not None and (y, x, 0) in model.door_states:
-                            door_open = model.door_states[(y, x, 0)] == "open"
+                        if model is not None and model.door_state[y, x, direction] != DoorState.ABSENT:
+                            door_open = model.door_state[y, x, direction] == DoorState.OPEN
                             door_color = 'green' if door_open else 'brown'
                         elif model is not None:
                             door_color = 'lightgreen'  # Destroyed doors
-                        ax.plot([x+0.25, x+0.75], [rows - y, rows - y], color=door_color, linewidth=2.5)
-                    elif wall_n:
+                        lines.append((half, door_color, 2.5))
+                    elif walls[direction]:
                         wall_color = 'black'
-                        if model is not None and (y, x, 0) in model.wall_damage:
-                            if model.wall_damage[(y, x, 0)] == 1:
+                        if model is not None:
+                            if model.wall_damage[y, x, direction] == 1:
                                 wall_color = 'orange'  # Damaged once
-                            elif model.wall_damage[(y, x, 0)] >= 2:
+                            elif model.wall_damage[y, x, direction] >= 2:
                                 wall_color = None  # Destroyed
                         
                         if wall_color:
-                            ax.plot([x, x+1], [rows - y, rows - y], color=wall_color, linewidth=2.5)
-                    
-                    # East direction
-                    if entry_e:
-                        ax.plot([x+1, x+1], [rows - y - 0.75, rows - y - 0.25], color='white', linewidth=4.0)
-                    elif door_e:
-                        door_color = 'brown'
-                        if model is not None and (y, x, 1) in model.door_states:
-                            door_open = model.door_states[(y, x, 1)] == "open"
-                            door_color = 'green' if door_open else 'brown'
-                        elif model is not None:
-                            door_color = 'lightgreen'
-                        ax.plot([x+1, x+1], [rows - y - 0.75, rows - y - 0.25], color=door_color, linewidth=2.5)
-                    elif wall_e:
-                        wall_color = 'black'
-                        if model is not None and (y, x, 1) in model.wall_damage:
-                            if model.wall_damage[(y, x, 1)] == 1:
-                                wall_color = 'orange'
-                            elif model.wall_damage[(y, x, 1)] >= 2:
-                                wall_color = None
-                        
-                        if wall_color:
-                            ax.plot([x+1, x+1], [rows - y - 1, rows - y], color=wall_color, linewidth=2.5)
-                    
-                    # South direction
-                    if entry_s:
-                        ax.plot([x+0.25, x+0.75], [rows - y - 1, rows - y - 1], color='white', linewidth=4.0)
-                    elif door_s:
-                        door_color = 'brown'
-                        if model is not None and (y, x, 2) in model.door_states:
-                            door_open = model.door_states[(y, x, 2)] == "open"
-                            door_color = 'green' if door_open else 'brown'
-                        elif model is not None:
-                            door_color = 'lightgreen'
-                        ax.plot([x+0.25, x+0.75], [rows - y - 1, rows - y - 1], color=door_color, linewidth=2.5)
-                    elif wall_s:
-                        wall_color = 'black'
-                        if model is not None and (y, x, 2) in model.wall_damage:
-                            if model.wall_damage[(y, x, 2)] == 1:
-                                wall_color = 'orange'
-                            elif model.wall_damage[(y, x, 2)] >= 2:
-                                wall_color = None
-                        
-                        if wall_color:
-                            ax.plot([x, x+1], [rows - y - 1, rows - y - 1], color=wall_color, linewidth=2.5)
-                    
-                    # West direction
-                    if entry_w:
-                        ax.plot([x, x], [rows - y - 0.75, rows - y - 0.25], color='white', linewidth=4.0)
-                    elif door_w:
-                        door_color = 'brown'
-                        if model is not None and (y, x, 3) in model.door_states:
-                            door_open = model.door_states[(y, x, 3)] == "open"
-                            door_color = 'green' if door_open else 'brown'
-                        elif model is not None:
-                            door_color = 'lightgreen'
-                        ax.plot([x, x], [rows - y - 0.75, rows - y - 0.25], color=door_color, linewidth=2.5)
-                    elif wall_w:
-                        wall_color = 'black'
-                        if model is not None and (y, x, 3) in model.wall_damage:
-                            if model.wall_damage[(y, x, 3)] == 1:
-                                wall_color = 'orange'
-                            elif model.wall_damage[(y, x, 3)] >= 2:
-                                wall_color = None
-                        
-                        if wall_color:
-                            ax.plot([x, x], [rows - y - 1, rows - y], color=wall_color, linewidth=2.5)
+                            lines.append((full, wall_color, 2.5))
+        
+        segments, colors, widths = zip(*lines)
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=widths))
                         
         # Create legend elements
         entry_line = plt.Line2D([0], [0], color='white', linewidth=4.0, label='Firefighter entry')
@@ -2184,11 +2192,12 @@ class Visualization:
             ax.set_xlim(-1, columns+1) 
             ax.set_ylim(-1, rows+1)
             
-            # Draw firefighters
-            for agent in model.schedule.agents:
-                x, y = agent.pos
-                ax.plot(x + 0.5, rows - y - 0.5, 'o', markersize=24, 
-                        markerfacecolor='blue', markeredgecolor='navy', alpha=0.7, zorder=25)
+            # Draw firefighters: one scatter for the markers, then a label each
+            placed = [(x, y, agent) for (x, y), agents in model.snapshot_positions_for_viz().items() for agent in agents]
+            if placed:
+                xs, ys, _ = zip(*placed)
+                Visualization._scatter(ax, xs, ys, rows, 'o', 24, 'blue', 'navy', alpha=0.7, zorder=25)
+            for x, y, agent in placed:
                 ax.text(x + 0.5, rows - y - 0.5, str(agent.unique_id), color='white', 
                         fontsize=12, ha='center', va='center', zorder=26)
             
@@ -2198,6 +2207,9 @@ class Visualization:
                             fire_marker, smoke_marker, victim_marker, false_alarm_marker], 
                     loc='upper center', bbox_to_anchor=(0.5, -0.05), ncol=4)
             ax.set_title("6×8 Scenario Map with Perimeter (8×10), Walls and Doors")
+            # Same 5% margins autoscaling gave the per-cell artists (the background image has none)
+            ax.set_xlim(-0.05 * columns, 1.05 * columns)
+            ax.set_ylim(-0.05 * rows, 1.05 * rows)
             
         # Final formatting
         ax.set_xticks(range(columns))
@@ -2206,9 +2218,17 @@ class Visualization:
         ax.set_yticklabels(range(rows - 1, -1, -1))
         ax.set_aspect('equal')
         ax.grid(False)
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, ax
 
+    @staticmethod
+    def _scatter(ax, xs, ys, rows, marker, markersize, facecolor, edgecolor, alpha=None, zorder=2):
+        """Draws one marker style at the centres of the given cells, sized like ax.plot markers"""
+        if len(xs) == 0:
+            return
+        ax.scatter(np.asarray(xs) + 0.5, rows - np.asarray(ys) - 0.5, s=markersize ** 2, marker=marker,
+                   facecolors=facecolor, edgecolors=edgecolor, alpha=alpha, zorder=zorder)
+
     @staticmethod
     def visualize_simulation(model, title=None):
         """Visualizes the current state of the simulation, including firefighters"""
@@ -2216,7 +2236,7 @@ class Visualization:
         plt.close('all')
         fig, ax = Visualization.visualize_grid_with_perimeter_and_doors(
             model.scenario["grid_walls"], 
-            ScenarioParser.compute_door_positions(model.scenario["doors"]), 
+            model.door_positions, 
             model.scenario["entries"],
             model.scenario["fires"],   
             model.scenario["pois"],
@@ -2241,57 +2261,112 @@ class Visualization:
         """
         pass
 
-if __name__ == "__main__":
+def run_steps(model, n, render_every=1):
+    """Runs up to n turns or until the game ends, drawing the board every render_every turns (0 disables drawing)"""
+    steps = 0
+    while steps < n and not model.simulation_over:
+        steps += 1
+        logger.debug("\n--- Paso %d ---", steps)
+        model.step()
+        
+        if render_every and steps % render_every == 0:
+            Visualization.visualize_simulation(model, f"Simulación - Paso {model.step_count}")
+    
+    return steps
+
+def run_one(seed_and_scenario, max_steps=49):
+    """Plays one headless game from a (seed, scenario) pair and returns (victims_rescued, victims_lost, steps)"""
+    seed, scenario = seed_and_scenario
+    # The model burns and clears the scenario's fires and POIs in place, and pool.map unpickles one
+    # chunk of tasks into a single shared dict, so every game starts from its own copy
+    model = FireRescueModel(copy.deepcopy(scenario), visualize_frames=False, seed=seed)
+    steps = run_steps(model, max_steps, render_every=0)
+    return model.victims_rescued, model.victims_lost, steps
+
+def run_batch(scenario, runs, processes=None):
+    """Plays runs independent games (seeds 0..runs-1) across a process pool and returns run_one's result for each"""
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run_one, [(seed, scenario) for seed in range(runs)])
+
+def main(argv=None):
+    """Runs the scenario from the command line; see --help for the options"""
+    parser = argparse.ArgumentParser(description="Flash Point: Fire Rescue simulation")
+    parser.add_argument("--no-frames", action="store_true",
+                        help="run headless, without drawing the board (same as BOMBERS_VIZ=0)")
+    parser.add_argument("--debug", action="store_true", help="log every turn's actions")
+    parser.add_argument("--batch", type=int, metavar="N",
+                        help="play N headless games in parallel and only print their summary")
+    args = parser.parse_args(argv)
+    if args.batch is not None and args.batch < 1:
+        parser.error("--batch needs a positive number of games")
+
     # Parse the complete scenario
     scenario = ScenarioParser.parse_scenario(scenario_content)
 
-    import sys
-    visualize_frames = True
-    if len(sys.argv) > 1 and sys.argv[1] == "--no-frames":
-        visualize_frames = False
+    # BOMBERS_VIZ=0 runs headless, like --no-frames
+    visualize_frames = os.environ.get("BOMBERS_VIZ", "1") == "1" and not args.no_frames
+    if args.debug:
+        # Only this module's logger: a DEBUG root logger would also dump matplotlib and numba internals
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+    
+    # Nothing is shown when running headless or in batch, so skip the interactive backend
+    if not visualize_frames or args.batch is not None:
+        plt.switch_backend("Agg")
+    
+    if args.batch is not None:
+        runs = args.batch
+        results = run_batch(scenario, runs)
+        victories = sum(1 for rescued, _, _ in results if rescued >= FireRescueModel.END_AT[FireRescueModel.RESCUED])
+        print(f"\n=== BATCH OF {runs} SIMULATIONS ===")
+        print(f"Victories: {victories}/{runs}")
+        print(f"Average victims rescued: {sum(r[0] for r in results) / runs:.2f}")
+        print(f"Average victims lost: {sum(r[1] for r in results) / runs:.2f}")
+        print(f"Average steps: {sum(r[2] for r in results) / runs:.2f}")
+        return
     
     print(f"\nVisualización por frames: {'Activada' if visualize_frames else 'Desactivada'}")
 
     # Calculate door positions for visualization
     door_positions = ScenarioParser.compute_door_positions(scenario["doors"])
 
-    # Show final map with doors
-    Visualization.visualize_grid_with_perimeter_and_doors(
-        scenario["grid_walls"], 
-        door_positions, 
-        scenario["entries"],
-        scenario["fires"],   
-        scenario["pois"]      
-    )
-    plt.show()
-
-    # Build the grid state
-    print("\n=== BUILDING GRID STATE ===")
-    grid_state = ScenarioParser.build_grid_state(scenario)
+    # Show final map with doors (skipped when running headless)
+    if visualize_frames:
+        Visualization.visualize_grid_with_perimeter_and_doors(
+            scenario["grid_walls"], 
+            door_positions, 
+            scenario["entries"],
+            scenario["fires"],   
+            scenario["pois"]      
+        )
+        plt.show()
 
     print("\n=== STARTING SIMULATION ===")
 
     # Initialize the model with our scenario
-    model = FireRescueModel(scenario, visualize_frames=visualize_frames)
+    # Frames are drawn by run_steps so the model does not render on its own
+    model = FireRescueModel(scenario, visualize_frames=False)
 
     # Show initial state
     print("\n=== SIMULATION IN PROGRESS ===")
     print("\n--- Initial state ---")
-    Visualization.visualize_simulation(model, "Estado Inicial")
-    """"
+    if visualize_frames:
+        Visualization.visualize_simulation(model, "Estado Inicial")
+
     # Continuous simulation until victory or defeat
-    step = 1
-    while not model.simulation_over and step < 50:
-        print(f"\n--- Paso {step} ---")
-        model.step()
-        step += 1
-    """
+    steps = run_steps(model, 49, render_every=1 if visualize_frames else 0)
 
     print("\n=== SIMULATION FINISHED ===")
-    print(f"Total steps executed: {step-1}")
+    print(f"Total steps executed: {steps}")
     print(f"Victims rescued: {model.victims_rescued}")
     print(f"Victims lost: {model.victims_lost}")
     print(f"Accumulated wall damage: {model.damage_counters}")
+
+if __name__ == "__main__":
+    main()
 else:
     import matplotlib
     matplotlib.use('Agg')  
\ No newline at end of file
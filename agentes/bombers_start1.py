@@ -6,15 +6,28 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import json
 import os
+try:
+    import orjson
+except ImportError:
+    # orjson is optional: without it frames are encoded with the standard json module
+    orjson = None
 import heapq
 import csv
 import time
+import atexit
+import queue
+import threading
 from datetime import datetime
 
 
 class JSONExporter:
     """Class to export game state to JSON files for Unity"""
 
+    # Encoded frames waiting for the writer thread, shared by every exporter so files are written in order
+    _write_queue = None
+    # First exception raised by the writer thread, re-raised to the simulation by save_frame() or flush()
+    _write_error = None
+
     def __init__(self, output_dir="game_data"):
         self.frame_counter = 0
         self.output_dir = output_dir
@@ -23,13 +36,56 @@ class JSONExporter:
             os.makedirs(output_dir)
 
     def save_frame(self, data):
-        """Saves a frame as a JSON file"""
+        """Saves a frame as a JSON file, encoded in memory and written in one call"""
+        JSONExporter._raise_write_error()
         filename = os.path.join(self.output_dir, f"frame_{self.frame_counter:04d}.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            buf = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            buf = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        # Encoded here, since the caller keeps mutating the lists in data; only the write is deferred
+        JSONExporter._writer_queue().put((filename, buf))
         self.frame_counter += 1
         return data
 
+    @classmethod
+    def _writer_queue(cls):
+        """Returns the frame queue, starting its writer thread on first use"""
+        if cls._write_queue is None:
+            cls._write_queue = queue.Queue(maxsize=64)
+            threading.Thread(target=cls._write_frames, args=(cls._write_queue,), daemon=True).start()
+            atexit.register(cls.flush)
+        return cls._write_queue
+
+    @classmethod
+    def _write_frames(cls, frames):
+        # Keeps draining the queue whatever fails, so put() and flush() never wait on a dead thread
+        while True:
+            filename, buf = frames.get()
+            try:
+                with open(filename, "wb") as f:
+                    f.write(buf)
+            except Exception as e:
+                if cls._write_error is None:
+                    cls._write_error = e
+            finally:
+                frames.task_done()
+
+    @classmethod
+    def _raise_write_error(cls):
+        """Raises the first error the writer thread hit, as save_frame did when it wrote the file itself"""
+        error = cls._write_error
+        if error is not None:
+            cls._write_error = None
+            raise error
+
+    @classmethod
+    def flush(cls):
+        """Blocks until every queued frame has been written, then raises the first write error if any"""
+        if cls._write_queue is not None:
+            cls._write_queue.join()
+        cls._raise_write_error()
+
     def initial_state(self, model):
         """Generates the JSON for the initial game state"""
         firefighters = []
@@ -219,7 +275,10 @@ class JSONExporter:
             }
         }
 
-        return self.save_frame(data)
+        data = self.save_frame(data)
+        # The game is over, so make sure all of its frames are on disk
+        self.flush()
+        return data
 
 # Scenario content (full format)
 scenario_content = """1001 1000 1000 1000 1100 0001 1000 1100
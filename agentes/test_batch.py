@@ -0,0 +1,9 @@
+from bombers import ScenarioParser, run_batch, run_one, scenario_content
+
+
+def test_batch_matches_fresh_games():
+    """Every game in a batch plays exactly like a game started from a freshly parsed scenario"""
+    runs = 20
+    scenario = ScenarioParser.parse_scenario(scenario_content)
+    fresh = [run_one((seed, ScenarioParser.parse_scenario(scenario_content))) for seed in range(runs)]
+    assert run_batch(scenario, runs, processes=2) == fresh